@@ -0,0 +1,150 @@
+"""
+Adaptive inference rate: skip pose inference while the patient is still and extrapolate landmarks
+"""
+from collections import deque
+from typing import Optional, Sequence
+
+import numpy as np
+
+from angle_calculator import AngleCalculator
+from constants import (ADAPTIVE_MAX_INTERVAL, ADAPTIVE_STILL_VELOCITY, ADAPTIVE_CPU_BUDGET,
+                       ADAPTIVE_MAX_EXTRAPOLATION, ADAPTIVE_ACTIVE_STILL_TIME, WorkoutPhase)
+from landmark_ingest import ArrayLandmarkList, IngestedResults
+
+
+class AdaptiveInferenceScheduler:
+    """
+    Decides per frame whether a session runs its pose model or reuses recent landmarks.
+
+    - Motion (tracked-joint angular velocity above `still_velocity`) snaps back to every frame.
+    - Stillness and the COUNTDOWN phase back off one frame at a time up to `max_interval`.
+      During ACTIVE reps the joints must stay still for `active_still_time` first, since every
+      turnaround is briefly slow and is exactly where rep peaks are measured.
+    - `cpu_budget` caps the fraction of each second a session may spend in inference.
+    - CALIBRATION and moving ACTIVE frames are always inferred, whatever the budget: their
+      extremes become thresholds and rep accuracy.
+    Skipped frames get landmarks linearly extrapolated from the last two inferences, or the
+    last inferred landmarks unchanged while the joints are still.
+    """
+
+    def __init__(self, right_indices: Sequence[int], left_indices: Sequence[int],
+                 max_interval: int = ADAPTIVE_MAX_INTERVAL,
+                 still_velocity: float = ADAPTIVE_STILL_VELOCITY,
+                 cpu_budget: float = ADAPTIVE_CPU_BUDGET,
+                 max_extrapolation: float = ADAPTIVE_MAX_EXTRAPOLATION,
+                 active_still_time: float = ADAPTIVE_ACTIVE_STILL_TIME):
+        self.joint_indices = {'RIGHT': tuple(right_indices), 'LEFT': tuple(left_indices)}
+        self._joint_array = np.array(list(self.joint_indices.values()))
+        self.max_interval = max(1, max_interval)
+        self.still_velocity = still_velocity
+        self.cpu_budget = cpu_budget
+        self.max_extrapolation = max_extrapolation
+        self.active_still_time = active_still_time
+        self.reset()
+
+    def reset(self):
+        self.interval = 1
+        self._frames_since_inference = 0
+        self._prev = None        # (time, landmarks array)
+        self._last = None        # (time, landmarks array)
+        self._last_angles = None
+        self._still_since = None   # time the tracked joints dropped below still_velocity
+        self._inference_log = deque()  # (time, seconds spent) within the last second
+        self.inferred_frames = 0
+        self.skipped_frames = 0
+
+    # --- SCHEDULING ---
+    def should_infer(self, phase, now: float) -> bool:
+        """True if this frame must go through the model"""
+        self._frames_since_inference += 1
+        if self._last is None or self._frames_since_inference >= self.interval:
+            return True
+        if now - self._last[0] > self.max_extrapolation:
+            return True
+        self.skipped_frames += 1
+        return False
+
+    def record_inference(self, points: Optional[np.ndarray], phase, now: float, duration: float) -> None:
+        """
+        Feeds a fresh model result back so the next interval can be chosen.
+        `points` is the frame's (33, 4) landmark array (None if no pose was found); it is copied.
+        """
+        self._frames_since_inference = 0
+        self.inferred_frames += 1
+
+        self._inference_log.append((now, duration))
+        while self._inference_log and now - self._inference_log[0][0] > 1.0:
+            self._inference_log.popleft()
+
+        if points is None:
+            # Lost the patient: keep looking every frame and never extrapolate stale points
+            self._prev = self._last = self._last_angles = None
+            self.interval = 1
+            return
+
+        points = points.copy()
+        velocity = self._angular_velocity(points, now)
+        self._prev, self._last = self._last, (now, points)
+
+        if velocity is None or velocity >= self.still_velocity:
+            self._still_since = None
+        elif self._still_since is None:
+            self._still_since = now
+        still = self._still_since is not None
+        if phase == WorkoutPhase.ACTIVE:
+            # A rep slows down at each turnaround too; only a sustained hold counts as still there
+            still = still and now - self._still_since >= self.active_still_time
+
+        # Calibration extremes and rep peaks are measured on these frames; an extrapolation
+        # overshoot would become a threshold or a rep's accuracy, so neither stillness nor the
+        # CPU budget may skip them
+        if phase == WorkoutPhase.CALIBRATION or (phase == WorkoutPhase.ACTIVE and not still):
+            self.interval = 1
+            return
+
+        if phase == WorkoutPhase.COUNTDOWN or still:
+            self.interval = min(self.interval + 1, self.max_interval)
+        else:
+            self.interval = 1
+
+        # Stay within the per-session CPU budget
+        busy = sum(d for _, d in self._inference_log)
+        if busy > self.cpu_budget:
+            self.interval = min(max(self.interval, 2) + 1, self.max_interval)
+
+    def _angular_velocity(self, points: np.ndarray, now: float) -> Optional[float]:
+        """Max degrees/second over both tracked joints since the previous inference"""
+        raw_angles = AngleCalculator.calculate_angles(points[self._joint_array, :2])
+        angles = dict(zip(self.joint_indices, raw_angles.tolist()))
+
+        velocity = None
+        if self._last_angles is not None and self._last is not None:
+            dt = now - self._last[0]
+            if dt > 0:
+                velocity = max(abs(angles[arm] - self._last_angles[arm]) for arm in angles) / dt
+        self._last_angles = angles
+        return velocity
+
+    # --- INTERPOLATION ---
+    def interpolate(self, now: float) -> IngestedResults:
+        """Constant-velocity extrapolation of the last two inferred landmark sets to `now` (held while still)"""
+        last_time, last_points = self._last
+        points = last_points.copy()
+        # Still joints: repeat the last real pose; extrapolating jitter only amplifies it
+        if self._prev is not None and self._still_since is None:
+            prev_time, prev_points = self._prev
+            span = last_time - prev_time
+            if span > 0:
+                points = last_points + (last_points - prev_points) * ((now - last_time) / span)
+                points[:, 3] = last_points[:, 3]
+
+        return IngestedResults(pose_landmarks=ArrayLandmarkList(points))
+
+    def stats(self) -> dict:
+        total = self.inferred_frames + self.skipped_frames
+        return {
+            "interval": self.interval,
+            "inferred_frames": self.inferred_frames,
+            "skipped_frames": self.skipped_frames,
+            "inference_ratio": round(self.inferred_frames / total, 3) if total else 1.0
+        }
@@ -3,8 +3,7 @@ AI Engine with BALANCED focus on both arms
 """
 import random
 import os
-import joblib
-import requests
+import threading
 import numpy as np
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -14,38 +13,76 @@ load_dotenv()
 class AIEngine:
     
     _model = None
+    _load_attempted = False
+    _load_lock = threading.Lock()
+    registry = None   # FormModelRegistry: per-exercise, hot-reloaded models (falls back to _model)
     
     @classmethod
     def load_model(cls):
-        """Loads the trained Random Forest model"""
-        if cls._model is None:
+        """
+        Loads the trained Random Forest model, compiled to NumPy node arrays when possible
+        (see compiled_forest; a fresh .forest.npz cache is served without importing sklearn).
+        Runs once, on first use or on a warm-up thread; later calls return the loaded model.
+        """
+        with cls._load_lock:
+            if cls._load_attempted:
+                return cls._model
+            cls._load_attempted = True
             try:
+                from compiled_forest import load_forest
                 model_path = os.path.join(os.path.dirname(__file__), "rehab_model.pkl")
-                if os.path.exists(model_path):
-                    cls._model = joblib.load(model_path)
+                cls._model = load_forest(model_path)
+                if cls._model is not None:
                     print(f"✅ AI Model Loaded: {model_path}")
                 else:
                     print("⚠️ AI Model not found. Using heuristics.")
             except Exception as e:
                 print(f"❌ Error loading AI model: {e}")
                 cls._model = None
+        return cls._model
+
+    @classmethod
+    def model_for(cls, exercise_name: str = None):
+        """Model currently serving an exercise (None = heuristics)"""
+        if cls.registry is not None:
+            model = cls.registry.model_for(exercise_name)
+            if model is not None:
+                return model
+        return cls._model if cls._load_attempted else cls.load_model()
 
     @classmethod
-    def predict_form(cls, features: list) -> int:
+    def predict_form(cls, features: list, exercise_name: str = None) -> int:
         """
         Predicts form quality using ML model
         Returns: 1 for Good Form, 0 for Bad Form
         """
-        if cls._model is None:
+        model = cls.model_for(exercise_name)
+        if model is None:
             return 1
         
         try:
             input_vector = np.array(features).reshape(1, -1)
-            prediction = cls._model.predict(input_vector)[0]
+            prediction = model.predict(input_vector)[0]
             return int(prediction)
         except Exception as e:
             return 1
 
+    @classmethod
+    def predict_form_batch(cls, features: np.ndarray, exercise_name: str = None) -> np.ndarray:
+        """
+        Predicts form quality for many feature rows (n, 16) in one model call
+        Returns: int array of 1 (Good Form) / 0 (Bad Form); all 1 without a model or on error
+        """
+        features = np.asarray(features, dtype=np.float64)
+        model = cls.model_for(exercise_name)
+        if model is None or len(features) == 0:
+            return np.ones(len(features), dtype=np.int64)
+
+        try:
+            return np.asarray(model.predict(features)).astype(np.int64)
+        except Exception as e:
+            return np.ones(len(features), dtype=np.int64)
+
     @staticmethod
     def get_detailed_analytics(sessions):
         """Processes session history for analytics"""
@@ -215,6 +252,7 @@ class AIEngine:
         Falls back to rule-based logic if API fails
         """
         api_key = os.getenv("GEMINI_API_KEY")
+        import requests
         
         # 1. API CALL TO GEMINI
         if api_key:
@@ -309,5 +347,4 @@ class AIEngine:
             
         return f"Great work on your {exercise}! You're at {reps} total reps. Keep the momentum!"
 
-# Initial load
-AIEngine.load_model()
\ No newline at end of file
+# The model loads on first prediction (or app.py's warm-up thread), not at import
\ No newline at end of file
@@ -2,16 +2,17 @@
 Angle calculation with ZERO jitter
 """
 import numpy as np
-from collections import deque
+
+from constants import SMOOTHING_FILTER
+from smoothing import create_smoother
 
 class AngleCalculator:
-    def __init__(self, smoothing_window=7):
-        self.buffers = {
-            'RIGHT': deque(maxlen=smoothing_window),
-            'LEFT': deque(maxlen=smoothing_window)
+    def __init__(self, smoothing_window=7, filter_mode=None):
+        self.filter_mode = filter_mode or SMOOTHING_FILTER
+        self.smoothers = {
+            'RIGHT': create_smoother(self.filter_mode, smoothing_window),
+            'LEFT': create_smoother(self.filter_mode, smoothing_window)
         }
-        self.ema = {'RIGHT': None, 'LEFT': None}
-        self.alpha = 0.5
 
     @staticmethod
     def calculate_angle(a, b, c):
@@ -21,20 +22,28 @@ class AngleCalculator:
         angle = abs(np.degrees(radians))
         return 360 - angle if angle > 180 else angle
 
-    def get_smoothed_angle(self, arm, angle):
-        buf = self.buffers[arm]
-        buf.append(angle)
+    @staticmethod
+    def calculate_angles(joints: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_angle over an (N, 3, 2) array of (A, B, C) triples, B the vertex"""
+        a, b, c = joints[:, 0], joints[:, 1], joints[:, 2]
+        radians = np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0]) - \
+                  np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0])
+        angles = np.abs(np.degrees(radians))
+        return np.where(angles > 180, 360 - angles, angles)
 
-        median = np.median(buf)
+    def get_smoothed_angle(self, arm, angle, timestamp=None):
+        """`timestamp` (seconds) lets the smoother measure velocity over the real frame interval"""
+        return int(self.smoothers[arm].update(angle, timestamp))
 
-        if self.ema[arm] is None:
-            self.ema[arm] = median
-        else:
-            self.ema[arm] = self.alpha * median + (1 - self.alpha) * self.ema[arm]
+    def get_velocity(self, arm) -> float:
+        """Smoothed angular velocity of the side in degrees/second"""
+        return self.smoothers[arm].velocity
 
-        return int(self.ema[arm])
+    @property
+    def latency_frames(self) -> float:
+        """Frames of delay the smoothing filter adds to a steadily moving joint"""
+        return self.smoothers['RIGHT'].latency_frames
 
     def reset_buffers(self):
-        for buf in self.buffers.values():
-            buf.clear()
-        self.ema = {'RIGHT': None, 'LEFT': None}
+        for smoother in self.smoothers.values():
+            smoother.reset()
@@ -1,18 +1,20 @@
 """
 Flask application with API routes - THREADING MODE (No Eventlet)
 INTEGRATED WITH: MongoDB, Ghost Toggle, Smart AI Coach, Streaming, and Accuracy Tracking
+
+Startup stays light: cv2 / MediaPipe, pymongo, flask_mail and the form model load on first
+use or on background threads (profile with `python -m benchmarks.import_profile`).
 """
+import time
+_import_started = time.perf_counter()
+
 from flask import Flask, Response, jsonify, request, render_template
-import cv2
-import mediapipe as mp
 import numpy as np
-import time
+import hmac
 import json
 import os
 import random
 import string
-import requests
-import certifi
 import threading
 import logging
 from collections import deque
@@ -20,15 +22,24 @@ from datetime import datetime
 from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_bcrypt import Bcrypt
-from pymongo import MongoClient
-from flask_mail import Mail, Message
-from flask_socketio import SocketIO, emit
-from bson.objectid import ObjectId
+from flask_socketio import SocketIO, emit, join_room, leave_room
 
 # --- IMPORT CUSTOM AI MODULES ---
 from workout_session import WorkoutSession
+from frame_pipeline import FramePipeline
+from frame_sources import CameraSource
+from session_manager import SessionManager, SessionLimitError
+from model_pool import ModelPool, ModelPoolExhausted, create_model
+from landmark_ingest import ingest_frames
+from state_stream import ListenerRegistry, StateStream, room_name, supported_formats
+from profiling import NODE_PROFILER, prometheus_text
+from form_inference import FormInferenceService
+from model_registry import FormModelRegistry
 from ai_engine import AIEngine
-from constants import EXERCISE_PRESETS
+from constants import (EXERCISE_PRESETS, MAX_CONCURRENT_SESSIONS, SESSION_IDLE_TIMEOUT,
+                       HOLISTIC_POOL_SIZE, HOLISTIC_POOL_MAX, INFERENCE_MODE, STATE_EMIT_HZ,
+                       RECORDING_DIR, FORM_MODEL_DIR, MONGO_CONNECT_RETRIES, MONGO_RETRY_DELAY,
+                       MONGO_RETRY_MAX_DELAY)
 
 # ----------------------------------------------------
 # 0. CONFIGURATION
@@ -56,7 +67,15 @@ app.config["MAIL_PORT"] = 587
 app.config["MAIL_USE_TLS"] = True
 app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
 app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
-mail = Mail(app)
+mail = None  # flask_mail.Mail, created on the first email
+
+def get_mail():
+    """Creates the Mail extension on first use so startup does not import flask_mail."""
+    global mail
+    if mail is None:
+        from flask_mail import Mail
+        mail = Mail(app)
+    return mail
 
 # ----------------------------------------------------
 # 2. DATABASE SETUP
@@ -74,109 +93,203 @@ exercises_collection = None
 protocols_collection = None
 notifications_collection = None
 
-try:
-    print("⏳ Attempting to connect to MongoDB...")
-    client = MongoClient(
-        MONGO_URI,
-        serverSelectionTimeoutMS=5000, # 5 second timeout
-        tls=True,
-        tlsCAFile=certifi.where(),
-        tlsAllowInvalidCertificates=True,
-    )
-    # Trigger a connection verify
-    client.admin.command("ping")
-    db = client[DB_NAME]
-
-    users_collection = db["users"]
-    otp_collection = db["otps"]
-    sessions_collection = db["sessions"]
-    exercises_collection = db["exercises"]
-    protocols_collection = db["protocols"]
-    notifications_collection = db["notifications"]
-
-    print(f"✅ Connected to MongoDB Cloud: {DB_NAME}")
-except Exception as e:
-    print(f"⚠️ DB Error: {e}")
-    print("⚠️ WARNING: Application running without Database. Login/Signup will fail.")
+def connect_database(retries: int = MONGO_CONNECT_RETRIES, delay: float = MONGO_RETRY_DELAY):
+    """
+    Connects to MongoDB with exponential backoff (retries=0 keeps trying). Runs on a background
+    thread; until it succeeds the collections stay None and routes answer "database unavailable".
+    """
+    global client, db, users_collection, otp_collection, sessions_collection
+    global exercises_collection, protocols_collection, notifications_collection
+    import certifi
+    from pymongo import MongoClient
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            print("⏳ Attempting to connect to MongoDB...")
+            candidate = MongoClient(
+                MONGO_URI,
+                serverSelectionTimeoutMS=5000, # 5 second timeout
+                tls=True,
+                tlsCAFile=certifi.where(),
+                tlsAllowInvalidCertificates=True,
+            )
+            # Trigger a connection verify
+            candidate.admin.command("ping")
+        except Exception as e:
+            print(f"⚠️ DB Error (attempt {attempt}): {e}")
+            if retries and attempt >= retries:
+                print("⚠️ WARNING: Application running without Database. Login/Signup will fail.")
+                return
+            time.sleep(min(delay * 2 ** (attempt - 1), MONGO_RETRY_MAX_DELAY))
+            continue
+
+        client = candidate
+        db = client[DB_NAME]
+        otp_collection = db["otps"]
+        sessions_collection = db["sessions"]
+        exercises_collection = db["exercises"]
+        protocols_collection = db["protocols"]
+        notifications_collection = db["notifications"]
+        users_collection = db["users"]  # last: most routes gate on it
+
+        print(f"✅ Connected to MongoDB Cloud: {DB_NAME}")
+        return
 
 # ----------------------------------------------------
 # 3. WORKOUT SESSION MANAGEMENT
 # ----------------------------------------------------
-workout_session = None
-last_session_report = None
-session_lock = threading.Lock()
-
-def get_camera_index():
-    """Detects available camera index."""
-    for i in range(2):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            cap.release()
-            return i
-    return 0 
-
-def init_session(exercise_name="Bicep Curl"):
-    """Initialize a new workout session with clean visuals and accuracy logic."""
-    global workout_session, last_session_report
-    
-    with session_lock:
-        # 1. Force close existing session
-        if workout_session:
-            try:
-                print("🛑 Stopping previous session...")
-                workout_session.stop()
-            except Exception as e:
-                print(f"⚠️ Error stopping previous session: {e}")
-            finally:
-                workout_session = None
-
-        # Reset last report for new session
-        last_session_report = None
-        
-        # 2. Start new session
-        print(f"🎥 Initializing Camera for {exercise_name}...")
-        workout_session = WorkoutSession(exercise_name)
-        
-        # Camera Initialization
-        cam_idx = get_camera_index()
-        workout_session.cap = cv2.VideoCapture(cam_idx)
-        
-        if not workout_session.cap.isOpened():
-            print("❌ Camera not accessible")
-            workout_session = None
-            raise Exception("Camera not accessible")
-            
-        workout_session.start()
+session_manager = SessionManager(
+    max_sessions=int(os.getenv("MAX_CONCURRENT_SESSIONS", MAX_CONCURRENT_SESSIONS)),
+    idle_timeout=float(os.getenv("SESSION_IDLE_TIMEOUT", SESSION_IDLE_TIMEOUT)),
+)
+
+# Warm inference graphs so "Start" does not pay model load time.
+# INFERENCE_MODE=pose_hands swaps full Holistic for Pose + periodic wrist-crop Hands.
+inference_mode = os.getenv("INFERENCE_MODE", INFERENCE_MODE)
+holistic_pool = ModelPool(
+    size=int(os.getenv("HOLISTIC_POOL_SIZE", HOLISTIC_POOL_SIZE)),
+    max_size=int(os.getenv("HOLISTIC_POOL_MAX", HOLISTIC_POOL_MAX)),
+    factory=lambda: create_model(inference_mode),
+)
+
+# Form models are versioned per exercise under FORM_MODEL_DIR and hot-swapped without restarts;
+# the bundled rehab_model.pkl serves any exercise without a registered version.
+# Both load on background threads (see start_background_services).
+form_models = FormModelRegistry(os.getenv("FORM_MODEL_DIR", FORM_MODEL_DIR))
+AIEngine.registry = form_models
+
+# Form-quality predictions from every session are micro-batched on one worker thread
+form_service = FormInferenceService()
+
+# Requests without a session id or email share this slot (single-patient clients)
+DEFAULT_SESSION_ID = "default"
+
+def _session_keys(data=None):
+    """Extracts (session_id, email) from a JSON payload or the query string."""
+    data = data or {}
+    session_id = data.get("session_id") or request.args.get("session_id")
+    email = data.get("email") or request.args.get("email")
+    return session_id, email
+
+def _get_session(data=None):
+    """Returns the live ManagedSession a request refers to, or None."""
+    session_id, email = _session_keys(data)
+    entry = session_manager.get(session_id, email)
+    if entry is None and not session_id:
+        entry = session_manager.get(DEFAULT_SESSION_ID)
+    return entry
+
+# Socket.IO clients listening to each session's state stream ("full" or "delta" payloads)
+listener_registry = ListenerRegistry()
+STATE_FORMATS = supported_formats()
+
+def _emit_to_room(event, payload, room):
+    socketio.emit(event, payload, to=room)
+
+def _new_stream(session_id, session):
+    return StateStream(
+        session_id, session, _emit_to_room, listener_registry,
+        max_hz=float(os.getenv("STATE_EMIT_HZ", STATE_EMIT_HZ))
+    )
+
+def _join_stream(sid, session_id, fmt="full"):
+    """Moves a socket into a session's room, leaving whichever room it was in."""
+    previous = listener_registry.join(sid, session_id, fmt)
+    if previous is not None:
+        leave_room(room_name(*previous), sid=sid)
+    join_room(room_name(session_id, fmt), sid=sid)
+
+def _stop_session(data=None):
+    """Stops the session a request refers to and returns its final report."""
+    session_id, email = _session_keys(data)
+    report = session_manager.stop(session_id, email)
+    if report is None and not session_id:
+        report = session_manager.stop(DEFAULT_SESSION_ID)
+    return report
+
+def _recording_path(session_id):
+    os.makedirs(RECORDING_DIR, exist_ok=True)
+    safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id)
+    return os.path.join(RECORDING_DIR, f"{safe_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.plr")
+
+
+def init_session(exercise_name="Bicep Curl", session_id=None, email=None, client_landmarks=False,
+                 headless=False, record=False):
+    """
+    Initialize a new workout session with clean visuals and accuracy logic.
+    With client_landmarks=True no camera or model is opened; the browser pushes landmarks.
+    With headless=True no annotated video is rendered or encoded; only state updates are emitted.
+    With record=True every frame's landmarks are written to a replayable file in RECORDING_DIR.
+    """
+    if not session_id and not email:
+        session_id = DEFAULT_SESSION_ID
+    session_id = session_manager.resolve_id(session_id, email) or session_manager.new_session_id()
+
+    # 1. Fail fast before touching the camera if the node is full
+    session_manager.reserve_slot(session_id, email)
+
+    # 2. Any previous session for this patient releases the camera first
+    if session_manager.stop(session_id, email):
+        print("🛑 Stopped previous session...")
+
+    # 3. Start new session
+    session = WorkoutSession(exercise_name, model_pool=holistic_pool, inference_mode=inference_mode,
+                             headless=headless, form_service=form_service)
+
+    stream = _new_stream(session_id, session)
+    record_path = _recording_path(session_id) if record else None
+
+    if client_landmarks:
+        print(f"📡 Starting client-landmark session for {exercise_name}...")
+        session.start(use_camera=False, record_path=record_path)
+        try:
+            entry = session_manager.register(session, session_id=session_id, email=email, stream=stream)
+        except SessionLimitError:
+            session.stop()
+            raise
+        return entry.session_id
 
-def generate_video_frames():
-    """Generator function to stream video frames and accuracy data."""
-    from constants import WorkoutPhase
-    global workout_session
+    print(f"🎥 Initializing Camera for {exercise_name}...")
     
+    # Camera Initialization (device probe is cached; the model is leased warm from the pool)
+    try:
+        session.start(source=CameraSource(), record_path=record_path)
+    except RuntimeError:
+        print("❌ Camera not accessible")
+        raise Exception("Camera not accessible")
+
+    # 4. Capture, inference and encoding run as overlapping stages;
+    #    state is serialized only at the stream's emit rate and only for listening rooms
+    pipeline = FramePipeline(
+        session,
+        on_state=stream.publish,
+        state_due=stream.due,
+        state_fn=stream.build_state
+    )
+    try:
+        entry = session_manager.register(session, session_id=session_id, email=email,
+                                         pipeline=pipeline, stream=stream)
+    except SessionLimitError:
+        session.stop()
+        raise
+    pipeline.start()
+    return entry.session_id
+
+def generate_video_frames(session_id=None, email=None):
+    """Generator function to stream encoded frames produced by a session's frame pipeline."""
     while True:
-        if workout_session is None or workout_session.phase == WorkoutPhase.INACTIVE:
+        entry = session_manager.get(session_id, email)
+        pipeline = entry.pipeline if entry else None
+        if pipeline is None or not pipeline.running:
             time.sleep(0.1)
             continue
 
         try:
-            # frame is now processed without technical black boxes ("Optimal Flow", etc.)
-            frame, valid = workout_session.process_frame()
-            
-            if not valid or frame is None:
-                continue
-
-            # Emit real-time state data (including Accuracy) to frontend via WebSocket
-            socketio.emit("workout_update", workout_session.get_state_dict())
-            
-            # Encode frame for HTTP Stream
-            ret, buffer = cv2.imencode(".jpg", frame)
-            if ret:
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n"
-                    + buffer.tobytes()
-                    + b"\r\n"
-                )
+            for chunk in pipeline.mjpeg_frames():
+                entry.touch()
+                yield chunk
         except Exception as e:
             logger.error(f"Stream Error: {e}")
             break
@@ -264,32 +377,58 @@ def _get_frontend_exercise_list():
 @socketio.on("connect")
 def handle_connect():
     print("🟢 Client connected to WebSocket")
+    # Clients that never call join_session follow the default session with full payloads
+    _join_stream(request.sid, DEFAULT_SESSION_ID, "full")
 
 @socketio.on("disconnect")
 def handle_disconnect():
     print("🔴 Client disconnected")
+    listener_registry.leave(request.sid)
+
+@socketio.on("join_session")
+def handle_join_session(data):
+    """
+    Subscribes this socket to one session's state updates.
+    format "full" -> legacy `workout_update` payloads;
+    format "delta" -> `workout_init` once, then `workout_delta` patches ({seq, base, patch});
+    format "packed" / "msgpack" -> `workout_init` with the schema, then binary `workout_packed`.
+    """
+    data = data or {}
+    fmt = data.get("format", "full")
+    if fmt not in STATE_FORMATS:
+        emit("join_error", {"message": f"Unknown format '{fmt}'"})
+        return
+
+    entry = _get_session(data)
+    session_id = entry.session_id if entry else (data.get("session_id") or DEFAULT_SESSION_ID)
+    _join_stream(request.sid, session_id, fmt)
+
+    if entry and entry.stream and fmt != "full":
+        emit("workout_init", entry.stream.init_payload(fmt))
+    emit("joined_session", {"session_id": session_id, "format": fmt})
+
+@socketio.on("leave_session")
+def handle_leave_session(data=None):
+    previous = listener_registry.leave(request.sid)
+    if previous is not None:
+        leave_room(room_name(*previous))
 
 @socketio.on("stop_session")
 def handle_stop_session(data):
-    global workout_session, last_session_report
-    if not workout_session:
-        return
-
     data = data or {}
     email = data.get("email")
     exercise = data.get("exercise", "Freestyle")
 
     try:
         print("🛑 Stop session command received")
-        with session_lock:
-            # SAVE REPORT BEFORE STOPPING
-            last_session_report = workout_session.get_final_report()
-            workout_session.stop()
-            workout_session = None 
+        # SAVE REPORT BEFORE STOPPING
+        report = _stop_session(data)
+        if report is None:
+            return
 
         if email and sessions_collection is not None:
-            r = last_session_report["summary"]["RIGHT"]
-            l = last_session_report["summary"]["LEFT"]
+            r = report["summary"]["RIGHT"]
+            l = report["summary"]["LEFT"]
             
             sessions_collection.insert_one({
                 "email": email,
@@ -305,13 +444,45 @@ def handle_stop_session(data):
         logger.error(f"Stop session error: {e}")
         emit("session_stopped", {"status": "error", "message": str(e)})
 
+@socketio.on("landmarks")
+def handle_landmarks(data):
+    """Socket.IO variant of landmark ingestion; state goes out through the session's rooms."""
+    data = data or {}
+    entry = _get_session(data)
+    if entry is None:
+        emit("landmarks_error", {"message": "No active session"})
+        return
+    if entry.session.use_camera:
+        # Same rule as the REST endpoint: the pipeline's inference thread already feeds this session
+        emit("landmarks_error", {"message": "Session is camera-backed; start it in client_landmarks mode to push landmarks"})
+        return
+
+    frames = data.get("frames")
+    if frames is None:
+        frames = [data]
+
+    # The sender follows its own session unless it already joined it explicitly
+    membership = listener_registry.membership(request.sid)
+    if membership is None or membership[0] != entry.session_id:
+        _join_stream(request.sid, entry.session_id, "full")
+
+    try:
+        with entry.lock:
+            ingest_frames(entry.session, frames)
+            if entry.stream.due():
+                entry.stream.publish(entry.stream.build_state())
+    except (ValueError, TypeError, KeyError) as e:
+        emit("landmarks_error", {"message": f"Invalid landmark batch: {e}"})
+        return
+
 @socketio.on("toggle_listening")
 def handle_toggle_listening(data):
-    global workout_session
-    if workout_session:
+    entry = _get_session(data)
+    if entry:
         active = data.get("active", False)
         print(f"🎙️ Setting listening mode to: {active}")
-        workout_session.set_listening(active)
+        with entry.lock:
+            entry.session.set_listening(active)
 
 # ----------------------------------------------------
 # 6. ANALYTICS & AI ROUTES
@@ -359,10 +530,11 @@ def ai_coach_commentary():
     data = request.get_json(silent=True) or {}
     
     if 'listening' in data:
-        global workout_session
-        if workout_session:
+        entry = _get_session(data)
+        if entry:
             active = data['listening']
-            workout_session.set_listening(active)
+            with entry.lock:
+                entry.session.set_listening(active)
             return jsonify({"status": "updated", "listening": active})
 
     context = data.get("context")
@@ -386,9 +558,10 @@ def ai_coach_commentary():
 @app.route('/toggle_ghost', methods=['POST'])
 def toggle_ghost():
     """Toggles the ghost overlay visibility"""
-    global workout_session
-    if workout_session:
-        new_state = workout_session.toggle_ghost()
+    entry = _get_session(request.get_json(silent=True))
+    if entry:
+        with entry.lock:
+            new_state = entry.session.toggle_ghost()
         return jsonify({"status": "success", "ghost_visible": new_state})
     return jsonify({"status": "error", "message": "No active session"}), 400
 
@@ -414,9 +587,10 @@ def send_otp():
     )
 
     try:
+        from flask_mail import Message
         msg = Message("PhysioCheck OTP", sender=app.config["MAIL_USERNAME"], recipients=[email])
         msg.body = f"Your verification code is: {otp}"
-        mail.send(msg)
+        get_mail().send(msg)
         return jsonify({"message": "OTP sent"}), 200
     except Exception as e:
         logger.error(f"Mail Error: {e}")
@@ -488,6 +662,7 @@ def google_auth():
         return jsonify({"error": "Google token is required"}), 400
 
     try:
+        import requests
         google_response = requests.get(
             f"https://www.googleapis.com/oauth2/v1/userinfo?access_token={token}",
             headers={"Accept": "application/json"}
@@ -669,45 +844,157 @@ def start_tracking():
     exercise = data.get("exercise", "Bicep Curl")
 
     try:
-        init_session(exercise)
-        if workout_session:
-            return jsonify({"status": "started", "exercise": exercise})
-        else:
-            return jsonify({"error": "Failed to initialize workout session"}), 500
+        client_landmarks = data.get("mode") == "client_landmarks"
+        headless = bool(data.get("headless", False))
+        record = bool(data.get("record", False))
+        session_id = init_session(exercise, data.get("session_id"), data.get("email"),
+                                  client_landmarks, headless, record)
+        return jsonify({
+            "status": "started",
+            "exercise": exercise,
+            "session_id": session_id,
+            "mode": "client_landmarks" if client_landmarks else "camera",
+            "headless": headless or client_landmarks,
+            "recording": record
+        })
+    except (SessionLimitError, ModelPoolExhausted) as e:
+        logger.warning(f"⚠️ start_tracking rejected: {e}")
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         logger.error(f"❌ Error in start_tracking: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/stop_tracking", methods=["POST"])
 def stop_tracking():
-    global workout_session, last_session_report
-    with session_lock:
-        if workout_session:
-            last_session_report = workout_session.get_final_report()
-            workout_session.stop()
-            workout_session = None
-            return jsonify({"status": "stopped", "report": last_session_report})
+    report = _stop_session(request.get_json(silent=True))
+    if report is not None:
+        return jsonify({"status": "stopped", "report": report})
     return jsonify({"status": "no_active_session"})
 
+@app.route("/api/sessions/<session_id>/landmarks", methods=["POST"])
+def ingest_landmarks(session_id):
+    """Batched client-side landmarks: {"frames": [{"t": ms, "landmarks": [[x, y, z, v] * 33]}]}"""
+    data = request.get_json(silent=True) or {}
+    entry = session_manager.get(session_id)
+    if entry is None:
+        return jsonify({"error": "No active session"}), 404
+    if entry.session.use_camera:
+        # The pipeline's inference thread already feeds this session; two writers would interleave
+        return jsonify({"error": "Session is camera-backed; start it in client_landmarks mode to push landmarks"}), 409
+
+    try:
+        with entry.lock:
+            processed = ingest_frames(entry.session, data.get("frames", []))
+            state = entry.session.get_state_dict()
+            if entry.stream.due():
+                entry.stream.publish(state)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": f"Invalid landmark batch: {e}"}), 400
+
+    return jsonify({"processed": processed, "state": state})
+
 @app.route("/video_feed")
 def video_feed():
+    session_id, email = _session_keys()
+    if not session_id and not email:
+        session_id = DEFAULT_SESSION_ID
     return Response(
-        generate_video_frames(),
+        generate_video_frames(session_id, email),
         mimetype="multipart/x-mixed-replace; boundary=frame"
     )
 
 @app.route("/report_data")
 def report_data():
-    global workout_session, last_session_report
-    
-    if workout_session:
-        return jsonify(workout_session.get_final_report())
+    session_id, email = _session_keys()
+
+    entry = _get_session()
+    if entry:
+        with entry.lock:
+            return jsonify(entry.session.get_final_report())
     
-    if last_session_report:
-        return jsonify(last_session_report)
+    last_report = session_manager.last_report(session_id or DEFAULT_SESSION_ID, email)
+    if last_report:
+        return jsonify(last_report)
         
     return jsonify({"error": "No session data found"})
 
+@app.route("/api/sessions", methods=["GET"])
+def list_sessions():
+    """Lists live sessions on this node (for clinic monitoring)."""
+    return jsonify({
+        "state_formats": STATE_FORMATS,
+        "sessions": session_manager.list_sessions(),
+        "max_sessions": session_manager.max_sessions,
+        "model_pool": holistic_pool.stats()
+    })
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape target: per-stage frame latency histograms plus node gauges."""
+    pool = holistic_pool.stats()
+    form = form_service.stats()
+    text = prometheus_text({
+        "rehab_active_sessions": len(session_manager),
+        "rehab_max_sessions": session_manager.max_sessions,
+        "rehab_model_pool_leased": pool["leased"],
+        "rehab_model_pool_total": pool["total"],
+        "rehab_form_requests": form["requests"],
+        "rehab_form_batches": form["batches"],
+        "rehab_form_pending": form["pending"],
+    })
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/models", methods=["GET"])
+def model_status():
+    """Form model versions serving each exercise, plus rejected rollouts."""
+    return jsonify(form_models.status())
+
+@app.route("/api/models/reload", methods=["POST"])
+def reload_models():
+    """Scans the model directory now instead of waiting for the next poll."""
+    return jsonify({"outcomes": form_models.refresh(), **form_models.status()})
+
+def _debug_authorized():
+    """True when the request carries DEBUG_API_TOKEN as a bearer token (unset = never)."""
+    token = os.getenv("DEBUG_API_TOKEN")
+    supplied = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())
+
+@app.route("/api/debug/profile", methods=["GET"])
+def debug_profile():
+    """
+    Rolling per-stage latency percentiles (ms) for the node; per-session detail only for
+    requests authorized with DEBUG_API_TOKEN.
+    """
+    profile = {
+        "enabled": NODE_PROFILER.enabled,
+        "node": NODE_PROFILER.snapshot(),
+        "form_inference": form_service.stats(),
+        "startup_seconds": round(STARTUP_SECONDS, 3),
+    }
+    if _debug_authorized():
+        profile["sessions"] = {sid: p.snapshot() for sid, p in session_manager.profilers().items()}
+    return jsonify(profile)
+
+def start_background_services():
+    """
+    Starts the worker threads and slow warm-ups (Mongo, model loads). Called once every route
+    is registered so their imports do not compete with the app's own for the GIL.
+    """
+    session_manager.start_reaper()
+    form_service.start()
+    form_models.start()
+    holistic_pool.prewarm_async()
+    threading.Thread(target=AIEngine.load_model, name="form-model-load", daemon=True).start()
+    threading.Thread(target=connect_database, name="mongo-connect", daemon=True).start()
+
+# Module import to ready-to-serve (heavy dependencies load later, off the request path)
+STARTUP_SECONDS = time.perf_counter() - _import_started
+print(f"⚡ App initialized in {STARTUP_SECONDS * 1000:.0f} ms")
+# BACKGROUND_SERVICES=0 imports the app without side effects (import profiling, tooling)
+if os.getenv("BACKGROUND_SERVICES", "1") != "0":
+    start_background_services()
+
 # ----------------------------------------------------
 # 12. RUN SERVER
 # ----------------------------------------------------
@@ -0,0 +1,203 @@
+"""
+Offline batch processor: re-scores recorded exercise videos without a camera
+
+Usage:
+    python batch_processor.py recordings/ --exercise "Bicep Curl" --out batch_output/ --workers 4
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from typing import List, Optional
+
+from constants import BATCH_VIDEO_EXTENSIONS, WorkoutPhase
+from smoothing import SMOOTHERS
+
+# One Holistic instance per worker process, created by the pool initializer
+_worker_model = None
+
+
+def _init_worker(inference_mode: str = "holistic"):
+    """Pool initializer: builds this worker's inference graph and loads the form model once"""
+    global _worker_model
+    from ai_engine import AIEngine
+    from model_pool import create_model
+    _worker_model = create_model(inference_mode)
+    AIEngine.load_model()
+
+
+def find_videos(input_dir: str) -> List[str]:
+    """Lists recorded videos in a directory (non-recursive, sorted for stable sharding)"""
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(BATCH_VIDEO_EXTENSIONS)
+    )
+
+
+def process_video(job: dict) -> dict:
+    """
+    Runs one recorded video through a WorkoutSession and writes its report and trace.
+    A failing video yields an error result instead of aborting the whole batch.
+    """
+    try:
+        return _process_video(job)
+    except Exception as e:
+        return {"file": job["path"], "status": "error", "message": f"{type(e).__name__}: {e}"}
+
+
+def _process_video(job: dict) -> dict:
+    from frame_sources import VideoFileSource
+    from clock import SimulatedClock
+    from workout_session import WorkoutSession
+
+    path = job["path"]
+    name = os.path.splitext(os.path.basename(path))[0]
+    output_dir = job["output_dir"]
+
+    source = VideoFileSource(path)
+    if not source.open():
+        return {"file": path, "status": "error", "message": "Could not open video"}
+
+    fps = source.fps
+    # Video time drives the session clock, so processing is not tied to wall time.
+    # It starts at an epoch time because RepCounter treats 0 as "no rep in progress".
+    base_time = time.time()
+    clock = SimulatedClock(base_time)
+    # Full-rate inference by default: re-scoring should not depend on frame skipping
+    session = WorkoutSession(job["exercise"], adaptive_inference=job.get("adaptive", False), headless=True,
+                             smoothing_filter=job.get("smoothing"), predictive=job.get("predictive"),
+                             clock=clock)
+
+    # Each video starts from a clean tracking state on the shared worker model
+    if _worker_model is not None and hasattr(_worker_model, "reset"):
+        _worker_model.reset()
+    session.start(source=source, holistic_model=_worker_model)
+
+    # Optional fixed thresholds skip calibration so archived sessions can be re-scored
+    if job.get("contracted") is not None and job.get("extended") is not None:
+        session.calibration_data.contracted_threshold = int(job["contracted"])
+        session.calibration_data.extended_threshold = int(job["extended"])
+        session.calibration_data.active = False
+        session.phase = WorkoutPhase.ACTIVE
+        session.start_time = session.calibration_manager.start_time
+
+    trace_path = os.path.join(output_dir, f"{name}.trace.csv")
+    wall_start = time.time()
+
+    try:
+        with open(trace_path, "w", newline="") as trace_file:
+            writer = csv.writer(trace_file)
+            writer.writerow(["frame", "time", "phase", "right_angle", "left_angle",
+                             "right_stage", "left_stage", "right_reps", "left_reps"])
+            while True:
+                success, image = session.read_frame()
+                if not success:
+                    break
+                frame_idx, video_time = source.frame_count - 1, source.timestamp
+                clock.set(base_time + video_time)
+                session.process_image(image)
+
+                right, left = session.arm_metrics['RIGHT'], session.arm_metrics['LEFT']
+                writer.writerow([frame_idx, round(video_time, 4), session.phase.value,
+                                 right.angle, left.angle, right.stage, left.stage,
+                                 right.rep_count, left.rep_count])
+    except Exception:
+        session.stop()   # release the video before the worker moves on to its next job
+        raise
+
+    report = session.get_final_report()
+    session.stop()
+
+    wall_time = time.time() - wall_start
+    frame_count = source.frame_count
+    video_duration = frame_count / fps
+    report["source"] = {
+        "file": path,
+        "frames": frame_count,
+        "fps": fps,
+        "video_duration": round(video_duration, 2),
+        "processing_time": round(wall_time, 2),
+        "realtime_factor": round(video_duration / wall_time, 2) if wall_time > 0 else None
+    }
+
+    with open(os.path.join(output_dir, f"{name}.report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    return {"file": path, "status": "ok", "report": report, "trace": trace_path}
+
+
+def run_batch(input_dir: str, output_dir: str, exercise: str = "Bicep Curl",
+              workers: Optional[int] = None, contracted: Optional[int] = None,
+              extended: Optional[int] = None, inference_mode: str = "holistic",
+              adaptive: bool = False, smoothing: Optional[str] = None,
+              predictive: Optional[bool] = None) -> List[dict]:
+    """Shards every video in input_dir across a process pool and collects the results"""
+    os.makedirs(output_dir, exist_ok=True)
+    videos = find_videos(input_dir)
+    if not videos:
+        print(f"⚠️ No videos found in {input_dir}")
+        return []
+
+    jobs = [{
+        "path": path, "output_dir": output_dir, "exercise": exercise,
+        "contracted": contracted, "extended": extended, "adaptive": adaptive,
+        "smoothing": smoothing, "predictive": predictive
+    } for path in videos]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    print(f"🎞️ Processing {len(jobs)} videos on {workers} workers...")
+
+    results = []
+    # spawn: MediaPipe graphs must not be inherited across fork
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers, initializer=_init_worker, initargs=(inference_mode,)) as pool:
+        for result in pool.imap_unordered(process_video, jobs, chunksize=1):
+            if result["status"] == "ok":
+                src = result["report"]["source"]
+                print(f"✅ {os.path.basename(result['file'])}: {src['frames']} frames, "
+                      f"{src['realtime_factor']}x real time")
+            else:
+                print(f"❌ {os.path.basename(result['file'])}: {result['message']}")
+            results.append(result)
+
+    results.sort(key=lambda r: r["file"])
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = {
+        "videos": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": [{k: v for k, v in r.items() if k != "trace"} for r in results]
+    }
+    with open(os.path.join(output_dir, "batch_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    if failed:
+        print(f"⚠️ {failed} of {len(results)} videos failed (see batch_summary.json)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score recorded exercise videos offline")
+    parser.add_argument("input_dir", help="Directory of recorded exercise videos")
+    parser.add_argument("--out", default="batch_output", help="Directory for reports and traces")
+    parser.add_argument("--exercise", default="Bicep Curl", help="Exercise preset name")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--contracted", type=int, default=None, help="Fixed contracted threshold (skips calibration)")
+    parser.add_argument("--extended", type=int, default=None, help="Fixed extended threshold (skips calibration)")
+    parser.add_argument("--inference-mode", default="holistic", choices=["holistic", "pose_hands"],
+                        help="Inference model per worker")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Skip inference on still frames (faster, may differ from full-rate scoring)")
+    parser.add_argument("--smoothing", default=None, choices=list(SMOOTHERS),
+                        help="Angle smoothing filter (default: SMOOTHING_FILTER)")
+    parser.add_argument("--predictive", action="store_true", default=None,
+                        help="Count reps on predicted threshold crossings")
+    args = parser.parse_args()
+
+    run_batch(args.input_dir, args.out, args.exercise, args.workers, args.contracted, args.extended,
+              args.inference_mode, args.adaptive, args.smoothing, args.predictive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Batch rep counting: re-scores whole angle series with the same rules as RepCounter.process_rep
+
+Usage:
+    python batch_rep_counter.py batch_output/ --contracted 45 --extended 165
+"""
+import argparse
+import csv
+import glob
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from constants import ArmStage, MIN_REP_DURATION, REP_PREDICTION_HORIZON, REP_PREDICTIVE_HOLD_TIME
+from rep_counter import RepCounter
+
+# Stage codes used internally; the streaming counter works with ArmStage values
+UP, DOWN, MOVING_UP, MOVING_DOWN = range(4)
+STAGE_NAMES = (ArmStage.UP.value, ArmStage.DOWN.value, ArmStage.MOVING_UP.value, ArmStage.MOVING_DOWN.value)
+STAGE_CODES = {name: code for code, name in enumerate(STAGE_NAMES)}
+
+
+def target_states(angles: np.ndarray, contracted: int, extended: int) -> np.ndarray:
+    """
+    Vectorized RepCounter._determine_target_state: row `s` holds the target stage of every
+    sample assuming the arm is currently in stage `s` (hysteresis makes it stage-dependent).
+    """
+    up_limit = contracted + RepCounter.STATE_BUFFER
+    down_limit = extended - RepCounter.STATE_BUFFER
+    in_up = angles <= up_limit
+    in_down = ~in_up & (angles >= down_limit)
+
+    targets = np.empty((4, len(angles)), dtype=np.int8)
+    targets[UP] = np.where(angles < up_limit + RepCounter.HYSTERESIS, UP, MOVING_DOWN)
+    targets[DOWN] = np.where(angles > down_limit - RepCounter.HYSTERESIS, DOWN, MOVING_UP)
+    targets[MOVING_UP] = MOVING_UP
+    targets[MOVING_DOWN] = MOVING_DOWN
+    targets[:, in_up] = UP
+    targets[:, in_down] = DOWN
+    return targets
+
+
+def _hold_index(times: np.ndarray, start: int, end: int, hold: float) -> int:
+    """First index in (start, end) whose `times[i] - times[start] >= hold`, else `end`"""
+    t0 = times[start]
+    i = max(int(np.searchsorted(times, t0 + hold, side="left")), start + 1)
+    # searchsorted works on t0 + hold; step to the exact float result of the subtraction
+    while i > start + 1 and times[i - 1] - t0 >= hold:
+        i -= 1
+    while i < end and times[i] - t0 < hold:
+        i += 1
+    return min(i, end)
+
+
+def stage_transitions(times: np.ndarray, targets: np.ndarray, hold: float,
+                      initial_stage: int = DOWN) -> List[tuple]:
+    """
+    Replays the pending-state confirmation over runs of identical targets instead of samples.
+    Returns [(sample index, previous stage, new stage)]. Sample 0 never changes state, as in
+    process_rep (it needs two samples of history).
+    """
+    n = targets.shape[1]
+    # Indices where each stage's target row changes value, and where it differs from the stage
+    changes = [np.flatnonzero(row[1:] != row[:-1]) + 1 for row in targets]
+    mismatches = [np.flatnonzero(row != s) for s, row in enumerate(targets)]
+
+    transitions = []
+    stage, i = initial_stage, 1
+    while i < n:
+        # Next sample whose target differs from the current stage: a pending state starts there
+        k = np.searchsorted(mismatches[stage], i)
+        if k == len(mismatches[stage]):
+            break
+        start = int(mismatches[stage][k])
+        pending = targets[stage, start]
+        c = np.searchsorted(changes[stage], start, side="right")
+        end = int(changes[stage][c]) if c < len(changes[stage]) else n
+
+        j = _hold_index(times, start, end, hold)
+        if j < end:
+            transitions.append((j, stage, int(pending)))
+            stage, i = int(pending), j + 1
+        else:
+            i = end
+    return transitions
+
+
+def count_reps(times: Sequence[float], angles: Sequence[float], contracted: int, extended: int,
+               min_rep_duration: float = MIN_REP_DURATION, velocities: Optional[Sequence[float]] = None,
+               predictive: bool = False) -> dict:
+    """
+    Rep boundaries, durations and accuracy for one side, identical to feeding the same
+    samples through RepCounter.process_rep. NaN angles mark frames the side was not tracked.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    angles = np.asarray(angles, dtype=np.float64)
+    tracked = ~np.isnan(angles)
+    times, angles = times[tracked], angles[tracked]
+
+    state_angles = angles
+    if predictive and velocities is not None:
+        state_angles = angles + np.asarray(velocities, dtype=np.float64)[tracked] * REP_PREDICTION_HORIZON
+    hold = REP_PREDICTIVE_HOLD_TIME if predictive else RepCounter.STATE_HOLD_TIME
+
+    transitions = stage_transitions(times, target_states(state_angles, contracted, extended), hold)
+
+    cal_range = abs(extended - contracted)
+    reps = []
+    rep_start, window_start = 0, 0
+    for idx, prev_stage, new_stage in transitions:
+        t = float(times[idx])
+        if prev_stage == UP and new_stage in (MOVING_DOWN, DOWN):
+            duration = t - rep_start
+            if duration >= min_rep_duration:
+                # Peaks run from the sample after the previous counted rep through this one
+                rep_min = min(180, float(angles[window_start:idx + 1].min()))
+                rep_max = max(0, float(angles[window_start:idx + 1].max()))
+                accuracy = 100 if cal_range == 0 else min(100, int((abs(rep_max - rep_min) / cal_range) * 100))
+                reps.append({"start": rep_start, "end": t, "duration": duration,
+                             "min_angle": rep_min, "max_angle": rep_max, "accuracy": accuracy})
+                rep_start, window_start = 0, idx + 1
+        elif new_stage == DOWN:
+            rep_start = t
+        elif new_stage == UP and rep_start == 0:
+            rep_start = t
+
+    return {
+        "rep_count": len(reps),
+        "reps": reps,
+        "transitions": [(float(times[i]), STAGE_NAMES[s]) for i, _, s in transitions],
+        "final_stage": STAGE_NAMES[transitions[-1][2]] if transitions else ArmStage.DOWN.value,
+    }
+
+
+def count_reps_both(times: Sequence[float], right: Sequence[float], left: Sequence[float],
+                    contracted: int, extended: int, **kwargs) -> Dict[str, dict]:
+    """count_reps for both sides over a shared time axis"""
+    return {'RIGHT': count_reps(times, right, contracted, extended, **kwargs),
+            'LEFT': count_reps(times, left, contracted, extended, **kwargs)}
+
+
+def stream_reps(times: Sequence[float], angles: Sequence[float], contracted: int, extended: int,
+                min_rep_duration: float = MIN_REP_DURATION, velocities: Optional[Sequence[float]] = None,
+                predictive: bool = False) -> dict:
+    """Reference result from the streaming RepCounter, in the same shape as count_reps"""
+    from models import ArmMetrics, CalibrationData
+
+    calibration = CalibrationData()
+    calibration.contracted_threshold, calibration.extended_threshold = contracted, extended
+    counter = RepCounter(calibration, min_rep_duration, predictive=predictive)
+    metrics = ArmMetrics()
+
+    reps, transitions = [], []
+    for i, (t, angle) in enumerate(zip(times, angles)):
+        if angle is None or angle != angle:
+            continue
+        rep_start, rep_min, rep_max = counter.rep_start_time['RIGHT'], counter.rep_min_angle['RIGHT'], counter.rep_max_angle['RIGHT']
+        stage, count = metrics.stage, metrics.rep_count
+        velocity = velocities[i] if velocities is not None else None
+        counter.process_rep('RIGHT', angle, metrics, t, None, velocity)
+        if metrics.stage != stage:
+            transitions.append((float(t), metrics.stage))
+        if metrics.rep_count > count:
+            reps.append({"start": rep_start, "end": float(t), "duration": metrics.rep_time,
+                         "min_angle": float(min(rep_min, angle)), "max_angle": float(max(rep_max, angle)),
+                         "accuracy": metrics.accuracy})
+    return {"rep_count": metrics.rep_count, "reps": reps, "transitions": transitions,
+            "final_stage": metrics.stage}
+
+
+def verify_parity(times: Sequence[float], angles: Sequence[float], contracted: int, extended: int,
+                  **kwargs) -> bool:
+    """True if the batch engine reproduces the streaming counter exactly on this series"""
+    return count_reps(times, angles, contracted, extended, **kwargs) == \
+        stream_reps(times, angles, contracted, extended, **kwargs)
+
+
+def rescore_trace(path: str, contracted: int, extended: int, **kwargs) -> Dict[str, dict]:
+    """Re-counts the ACTIVE-phase angles of a batch_processor trace with new thresholds"""
+    with open(path, newline="") as f:
+        rows = [r for r in csv.DictReader(f) if r["phase"] == "ACTIVE"]
+    times = [float(r["time"]) for r in rows]
+    # The live session skips untracked frames (recorded as 0) rather than counting them
+    right = [float(r["right_angle"]) or np.nan for r in rows]
+    left = [float(r["left_angle"]) or np.nan for r in rows]
+    return count_reps_both(times, right, left, contracted, extended, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-count reps in batch processor traces with new thresholds")
+    parser.add_argument("trace_dir", help="Directory of *.trace.csv files")
+    parser.add_argument("--contracted", type=int, required=True, help="Contracted threshold (degrees)")
+    parser.add_argument("--extended", type=int, required=True, help="Extended threshold (degrees)")
+    parser.add_argument("--min-rep-duration", type=float, default=MIN_REP_DURATION, help="Seconds")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.trace_dir, "*.trace.csv")))
+    if not paths:
+        print(f"⚠️ No traces found in {args.trace_dir}")
+        return
+    for path in paths:
+        result = rescore_trace(path, args.contracted, args.extended, min_rep_duration=args.min_rep_duration)
+        right, left = result['RIGHT'], result['LEFT']
+        print(f"✅ {os.path.basename(path)}: RIGHT {right['rep_count']} reps, LEFT {left['rep_count']} reps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks for the rep tracking hot path (run each module with `python -m benchmarks.<name>`)
+"""
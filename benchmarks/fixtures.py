@@ -0,0 +1,107 @@
+"""
+Deterministic landmark fixtures: a synthetic bicep-curl session (calibration holds, then
+steady reps) generated with a seeded RNG, and helpers to write it as a landmark recording
+"""
+import math
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from constants import POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT
+from landmark_recording import LandmarkRecorder
+
+# Fixed session start so fixture timestamps never collide with the counters' 0 sentinels
+FIXTURE_ORIGIN = 1_700_000_000.0
+
+# Neutral standing pose (mirrored camera view, x/y normalized); arms are posed per frame
+_BODY = {
+    0: (0.50, 0.15),
+    1: (0.49, 0.13), 2: (0.48, 0.13), 3: (0.47, 0.13), 4: (0.51, 0.13), 5: (0.52, 0.13), 6: (0.53, 0.13),
+    7: (0.45, 0.14), 8: (0.55, 0.14), 9: (0.49, 0.17), 10: (0.51, 0.17),
+    11: (0.40, 0.30), 12: (0.60, 0.30),
+    23: (0.44, 0.60), 24: (0.56, 0.60),
+    25: (0.44, 0.75), 26: (0.56, 0.75),
+    27: (0.44, 0.90), 28: (0.56, 0.90),
+    29: (0.43, 0.92), 30: (0.57, 0.92),
+    31: (0.45, 0.94), 32: (0.55, 0.94),
+}
+# (shoulder, elbow, wrist, hand points, outward sign) per side
+_ARMS = ((12, 14, 16, (18, 20, 22), 1.0), (11, 13, 15, (17, 19, 21), -1.0))
+_UPPER_ARM, _FOREARM = 0.2, 0.2
+
+# Calibration schedule matching the live flow: hold extended, hold contracted, then curl
+EXTENDED_ANGLE, CONTRACTED_ANGLE = 170.0, 40.0
+EXTENDED_HOLD, CONTRACTED_HOLD = 5.5, 6.5
+
+FIXTURES: Dict[str, dict] = {
+    "curl_short": {"seconds": 30, "fps": 30, "period": 3.0},
+    "curl_60s": {"seconds": 60, "fps": 30, "period": 3.0},
+    "curl_10min": {"seconds": 600, "fps": 30, "period": 3.0},
+}
+
+
+def elbow_angles(times: np.ndarray, period: float = 3.0) -> np.ndarray:
+    """Ground-truth elbow angle (degrees) at each time offset from the session start"""
+    curl_start = EXTENDED_HOLD + CONTRACTED_HOLD
+    mid, amplitude = (EXTENDED_ANGLE + CONTRACTED_ANGLE) / 2, (EXTENDED_ANGLE - CONTRACTED_ANGLE) / 2
+    curls = mid + amplitude * np.cos(2 * math.pi * (times - curl_start) / period)
+    return np.where(times < EXTENDED_HOLD, EXTENDED_ANGLE,
+                    np.where(times < curl_start, CONTRACTED_ANGLE, curls))
+
+
+def curl_session(seconds: float = 60, fps: float = 30, period: float = 3.0, noise: float = 0.002,
+                 seed: int = 7) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (times, pose, right hand) arrays for a synthetic session: times are absolute (from
+    FIXTURE_ORIGIN), pose is (n, 33, 4) float32 and the right hand a relaxed fist (n, 21, 4).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    offsets = np.arange(n, dtype=np.float64) / fps
+    angles = np.radians(elbow_angles(offsets, period))
+
+    pose = np.zeros((n, POSE_LANDMARK_COUNT, 4), dtype=np.float32)
+    for index, (x, y) in _BODY.items():
+        pose[:, index, :2] = (x, y)
+    for shoulder, elbow, wrist, hand_points, sign in _ARMS:
+        sx, sy = _BODY[shoulder]
+        pose[:, shoulder, :2] = (sx, sy)
+        pose[:, elbow, :2] = (sx, sy + _UPPER_ARM)
+        pose[:, wrist, 0] = sx + sign * _FOREARM * np.sin(angles)
+        pose[:, wrist, 1] = sy + _UPPER_ARM - _FOREARM * np.cos(angles)
+        pose[:, list(hand_points), :2] = pose[:, wrist, None, :2]
+    pose[:, :, :2] += rng.normal(0.0, noise, (n, POSE_LANDMARK_COUNT, 2)).astype(np.float32)
+    pose[:, :, 3] = 0.99
+
+    # Fingers curled around the right wrist: never a V-sign, but the gesture check still runs
+    curl = np.linspace(0.0, 0.03, HAND_LANDMARK_COUNT, dtype=np.float32)
+    right_hand = np.zeros((n, HAND_LANDMARK_COUNT, 4), dtype=np.float32)
+    right_hand[:, :, 0] = pose[:, 16, None, 0] + curl
+    right_hand[:, :, 1] = pose[:, 16, None, 1] + curl[::-1]
+    return FIXTURE_ORIGIN + offsets, pose, right_hand
+
+
+def write_recording(path: str, seconds: float = 60, fps: float = 30, period: float = 3.0,
+                    exercise_name: str = "Bicep Curl", compress: bool = True, seed: int = 7) -> str:
+    """Writes a synthetic session as a landmark recording (replayable with landmark_recording.replay)"""
+    from landmark_ingest import ArrayLandmarkList, IngestedResults
+
+    times, pose, right_hand = curl_session(seconds, fps, period, seed=seed)
+    recorder = LandmarkRecorder(path, exercise_name, origin=FIXTURE_ORIGIN, compress=compress)
+    for t, points, hand in zip(times.tolist(), pose, right_hand):
+        recorder.record(t, IngestedResults(pose_landmarks=ArrayLandmarkList(points),
+                                           right_hand_landmarks=ArrayLandmarkList(hand)), points)
+    recorder.close()
+    return path
+
+
+def fixture_path(name: str, directory: str, compress: bool = True) -> str:
+    """Path of a named fixture recording in `directory`, generating it on first use"""
+    spec = FIXTURES[name]
+    path = os.path.join(directory, f"{name}.plr")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_recording(path, compress=compress, **spec)
+    return path
+
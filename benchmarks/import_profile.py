@@ -0,0 +1,111 @@
+"""
+Import-time profile of the server: how long `import app` takes and which modules it spends it on
+
+Runs the import in a fresh interpreter with `-X importtime`, so caches from this process do
+not hide anything, and reports the slowest imports made by the module plus any heavy
+dependency that startup was supposed to defer. Background services are off by default
+(BACKGROUND_SERVICES=0): their threads import in parallel and would garble the timings.
+
+Usage:
+    python -m benchmarks.import_profile                  # profile `import app`
+    python -m benchmarks.import_profile --module workout_session --top 20
+    python -m benchmarks.import_profile --background    # also start Mongo / model warm-up threads
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Loaded on first use / background threads; none of them should appear at import time
+DEFERRED_MODULES = ("cv2", "mediapipe", "pymongo", "flask_mail", "sklearn", "joblib")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_import(module: str, background: bool = False) -> dict:
+    """Imports `module` in a subprocess; returns wall time, per-module timings and deferred-module leaks"""
+    env = {**os.environ, "BACKGROUND_SERVICES": "1" if background else "0"}
+    probe = (f"import sys, time; t = time.perf_counter(); import {module}; "
+             f"print(time.perf_counter() - t); print(','.join(sorted(sys.modules)))")
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=_ROOT, env=env,
+                          capture_output=True, text=True, timeout=300)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # importtime prints a module after everything it imported, one indent level deeper
+    rows: List[Dict] = []
+    children: List[Dict] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        row = {"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000,
+               "depth": len(indent) // 2, "parent": None}
+        if row["depth"] == 1:
+            children.append(row)
+        elif row["depth"] == 0:
+            for child in children:
+                child["parent"] = name
+            children = []
+        rows.append(row)
+
+    stdout = proc.stdout.strip().splitlines()
+    import_seconds = float(stdout[-2])
+    loaded = set(stdout[-1].split(","))
+    return {
+        "module": module,
+        "import_seconds": round(import_seconds, 3),
+        "process_seconds": round(wall, 3),
+        "modules_loaded": len(loaded),
+        "deferred_loaded": [m for m in DEFERRED_MODULES if m in loaded],
+        "timings": rows,
+    }
+
+
+def print_report(result: dict, top: int):
+    print(f"⏱️ import {result['module']}: {result['import_seconds'] * 1000:.0f} ms "
+          f"({result['process_seconds'] * 1000:.0f} ms incl. interpreter start), "
+          f"{result['modules_loaded']} modules")
+
+    direct = sorted((r for r in result["timings"] if r["parent"] == result["module"]),
+                    key=lambda r: -r["cumulative_ms"])
+    print(f"\nSlowest imports made by {result['module']} (cumulative):")
+    for row in direct[:top]:
+        print(f"  {row['cumulative_ms']:9.1f} ms  {row['module']}")
+
+    heaviest = sorted(result["timings"], key=lambda r: -r["self_ms"])
+    print(f"\nMost time in module body (self):")
+    for row in heaviest[:top]:
+        print(f"  {row['self_ms']:9.1f} ms  {row['module']}")
+
+    if result["deferred_loaded"]:
+        print(f"\n⚠️ Loaded at import time but meant to be deferred: {', '.join(result['deferred_loaded'])}")
+    else:
+        print(f"\n✅ None of {', '.join(DEFERRED_MODULES)} loaded at import time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile server import time")
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--background", action="store_true", help="Start background services during the import")
+    parser.add_argument("--json", default=None, help="Also write the full profile to this file")
+    args = parser.parse_args()
+
+    result = profile_import(args.module, args.background)
+    print_report(result, args.top)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Rep-transition latency: how long after the joint really crosses a threshold each
+smoothing filter / rep counter pair reacts
+
+Usage:
+    python -m benchmarks.rep_latency_bench                        # synthetic curl traces
+    python -m benchmarks.rep_latency_bench --fps 15               # ... at another camera rate
+    python -m benchmarks.rep_latency_bench --traces batch_output/ # *.trace.csv from batch_processor.py
+"""
+import argparse
+import csv
+import glob
+import math
+import os
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from angle_calculator import AngleCalculator
+from constants import SMOOTHING_WINDOW, MIN_REP_DURATION, ArmStage
+from models import ArmMetrics, CalibrationData
+from rep_counter import RepCounter
+
+# (smoothing filter, predictive rep counting); the first entry is the baseline
+CONFIGS = [
+    ("median_ema", False),
+    ("one_euro", False),
+    ("kalman", False),
+    ("one_euro", True),
+    ("kalman", True),
+]
+
+
+def synthetic_traces(fps: float = 30.0, noise: float = 3.0, seed: int = 11) -> List[dict]:
+    """Curl traces at a few tempos; the clean signal doubles as ground truth"""
+    rng = random.Random(seed)
+    traces = []
+    for period in (2.0, 3.0, 4.0):
+        times = [i / fps for i in range(int(30 * fps))]
+        clean = [105 + 62 * math.cos(2 * math.pi * t / period) for t in times]
+        traces.append({
+            "name": f"synthetic_{period:g}s",
+            "times": times,
+            "angles": [a + rng.gauss(0, noise) for a in clean],
+            "reference": clean,
+            "contracted": 40, "extended": 170,
+        })
+    return traces
+
+
+def _centered_median(values: List[float], window: int = 7) -> List[float]:
+    """Zero-phase reference for recorded traces (it looks ahead, so no live filter can match it)"""
+    half = window // 2
+    padded = np.pad(np.asarray(values, dtype=float), half, mode="edge")
+    return [float(np.median(padded[i:i + window])) for i in range(len(values))]
+
+
+def load_traces(directory: str, contracted: Optional[int], extended: Optional[int]) -> List[dict]:
+    """Per-side ACTIVE-phase angle series from batch processor traces"""
+    traces = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.trace.csv"))):
+        with open(path, newline="") as f:
+            rows = [r for r in csv.DictReader(f) if r["phase"] == "ACTIVE"]
+        for side in ("right", "left"):
+            samples = [(float(r["time"]), float(r[f"{side}_angle"])) for r in rows if float(r[f"{side}_angle"]) > 0]
+            if len(samples) < 30:
+                continue
+            times, angles = [t for t, _ in samples], [a for _, a in samples]
+            traces.append({
+                "name": f"{os.path.basename(path).replace('.trace.csv', '')}:{side}",
+                "times": times,
+                "angles": angles,
+                "reference": _centered_median(angles),
+                "contracted": contracted if contracted is not None else int(np.percentile(angles, 5)),
+                "extended": extended if extended is not None else int(np.percentile(angles, 95)),
+            })
+    return traces
+
+
+def reference_events(times, reference, contracted: int) -> Tuple[List[float], List[float]]:
+    """Times the true signal enters the UP zone and leaves it again (where a rep is counted)"""
+    up_limit = contracted + RepCounter.STATE_BUFFER
+    ups, reps = [], []
+    in_up = False
+    for t, angle in zip(times, reference):
+        if not in_up and angle <= up_limit:
+            in_up = True
+            ups.append(t)
+        elif in_up and angle >= up_limit + RepCounter.HYSTERESIS:
+            in_up = False
+            reps.append(t)
+    return ups, reps
+
+
+def detected_events(trace: dict, filter_mode: str, predictive: bool) -> Tuple[List[float], List[float]]:
+    """Runs one side through AngleCalculator + RepCounter and records UP entries and counted reps"""
+    calibration = CalibrationData()
+    calibration.contracted_threshold = trace["contracted"]
+    calibration.extended_threshold = trace["extended"]
+    angle_calc = AngleCalculator(SMOOTHING_WINDOW, filter_mode=filter_mode)
+    counter = RepCounter(calibration, MIN_REP_DURATION, predictive=predictive)
+    metrics = ArmMetrics()
+
+    ups, reps = [], []
+    for t, raw in zip(trace["times"], trace["angles"]):
+        angle = angle_calc.get_smoothed_angle('RIGHT', raw, t)
+        stage, count = metrics.stage, metrics.rep_count
+        counter.process_rep('RIGHT', angle, metrics, t, None, angle_calc.get_velocity('RIGHT'))
+        if metrics.stage == ArmStage.UP.value and stage != ArmStage.UP.value:
+            ups.append(t)
+        if metrics.rep_count > count:
+            reps.append(t)
+    return ups, reps
+
+
+def match_latencies(reference: List[float], detected: List[float], window: float = 1.0) -> Tuple[List[float], int]:
+    """Pairs each reference event with the first unused detection within +-window seconds"""
+    latencies, used = [], 0
+    j = 0
+    for r in reference:
+        while j < len(detected) and detected[j] < r - window:
+            j += 1
+        if j < len(detected) and detected[j] <= r + window:
+            latencies.append(detected[j] - r)
+            j += 1
+            used += 1
+    return latencies, len(detected) - used
+
+
+def _summary(latencies: List[float]) -> str:
+    if not latencies:
+        return f"{'-':>8}{'-':>8}{'-':>8}"
+    ms = np.asarray(latencies) * 1000
+    return f"{np.mean(ms):>8.0f}{np.median(ms):>8.0f}{np.percentile(ms, 95):>8.0f}"
+
+
+def run(traces: List[dict]) -> List[dict]:
+    rows = []
+    for filter_mode, predictive in CONFIGS:
+        up_lat, rep_lat, missed, extra, expected = [], [], 0, 0, 0
+        for trace in traces:
+            ref_ups, ref_reps = reference_events(trace["times"], trace["reference"], trace["contracted"])
+            ups, reps = detected_events(trace, filter_mode, predictive)
+            lat, _ = match_latencies(ref_ups, ups)
+            up_lat += lat
+            lat, unmatched = match_latencies(ref_reps, reps)
+            rep_lat += lat
+            missed += len(ref_reps) - len(lat)
+            extra += unmatched
+            expected += len(ref_reps)
+        rows.append({"filter": filter_mode, "predictive": predictive, "up_latency": up_lat,
+                     "rep_latency": rep_lat, "expected_reps": expected, "missed": missed, "extra": extra})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure rep-transition latency per smoothing mode")
+    parser.add_argument("--traces", default=None, help="Directory of *.trace.csv files (default: synthetic)")
+    parser.add_argument("--contracted", type=int, default=None, help="Contracted threshold for recorded traces")
+    parser.add_argument("--extended", type=int, default=None, help="Extended threshold for recorded traces")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of the synthetic traces")
+    args = parser.parse_args()
+
+    traces = load_traces(args.traces, args.contracted, args.extended) if args.traces else synthetic_traces(args.fps)
+    if not traces:
+        print(f"⚠️ No usable traces in {args.traces}")
+        return
+    print(f"📈 {len(traces)} traces")
+
+    rows = run(traces)
+    baseline = np.mean(rows[0]["rep_latency"]) if rows[0]["rep_latency"] else None
+    print(f"{'mode':<22}{'UP entry ms (mean/med/p95)':>26}{'rep count ms (mean/med/p95)':>28}"
+          f"{'reps':>7}{'missed':>8}{'extra':>7}{'vs base':>9}")
+    for r in rows:
+        mode = r["filter"] + (" +predict" if r["predictive"] else "")
+        delta = ""
+        if baseline is not None and r["rep_latency"]:
+            delta = f"{(np.mean(r['rep_latency']) - baseline) * 1000:+.0f}ms"
+        print(f"{mode:<22}{'':>2}{_summary(r['up_latency'])}{'':>4}{_summary(r['rep_latency'])}"
+              f"{r['expected_reps']:>7}{r['missed']:>8}{r['extra']:>7}{delta:>9}")
+
+
+if __name__ == "__main__":
+    main()
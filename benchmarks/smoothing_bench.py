@@ -0,0 +1,88 @@
+"""
+Streaming smoothers vs the original deque + np.median smoother
+
+Usage:
+    python -m benchmarks.smoothing_bench --frames 20000 --window 7
+"""
+import argparse
+import math
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from smoothing import SMOOTHERS, create_smoother
+
+
+class DequeMedianEma:
+    """The pre-streaming AngleCalculator smoother, kept here as the baseline"""
+
+    def __init__(self, window: int, alpha: float = 0.5):
+        self.buffer = deque(maxlen=window)
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, angle: float) -> float:
+        self.buffer.append(angle)
+        median = np.median(self.buffer)
+        self.value = median if self.value is None else self.alpha * median + (1 - self.alpha) * self.value
+        return self.value
+
+
+def synthetic_angles(frames: int, fps: float = 30.0, noise: float = 3.0, seed: int = 7):
+    """Curl-like angle trace (3 s reps between 40 and 170 degrees) plus landmark jitter"""
+    rng = random.Random(seed)
+    clean = [105 + 65 * math.cos(2 * math.pi * (i / fps) / 3.0) for i in range(frames)]
+    noisy = [a + rng.gauss(0, noise) for a in clean]
+    return clean, noisy
+
+
+def _lag_frames(clean, smoothed, max_lag: int = 30) -> int:
+    """Shift of the smoothed trace that best lines it up with the clean one"""
+    clean, smoothed = np.asarray(clean), np.asarray(smoothed)
+    errors = [np.mean((smoothed[lag:] - clean[:len(clean) - lag]) ** 2) for lag in range(max_lag)]
+    return int(np.argmin(errors))
+
+
+def run(frames: int, window: int) -> list:
+    clean, noisy = synthetic_angles(frames)
+    candidates = [("deque_median_ema (baseline)", DequeMedianEma(window))]
+    candidates += [(name, create_smoother(name, window)) for name in SMOOTHERS]
+
+    rows = []
+    baseline_ints = None
+    for name, smoother in candidates:
+        start = time.perf_counter()
+        out = [smoother.update(a) for a in noisy]
+        elapsed = time.perf_counter() - start
+
+        ints = [int(v) for v in out]
+        if baseline_ints is None:
+            baseline_ints = ints
+        rows.append({
+            "filter": name,
+            "us_per_update": round(elapsed / frames * 1e6, 3),
+            "rms_error": round(float(np.sqrt(np.mean((np.asarray(out) - clean) ** 2))), 3),
+            "measured_lag": _lag_frames(clean, out),
+            "reported_lag": round(getattr(smoother, "latency_frames", float("nan")), 2),
+            "matches_baseline": ints == baseline_ints,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark angle smoothing filters")
+    parser.add_argument("--frames", type=int, default=20000, help="Synthetic frames per filter")
+    parser.add_argument("--window", type=int, default=7, help="Median window")
+    args = parser.parse_args()
+
+    rows = run(args.frames, args.window)
+    print(f"{'filter':<30}{'µs/update':>11}{'rms err':>10}{'lag':>6}{'reported':>10}{'parity':>8}")
+    for r in rows:
+        print(f"{r['filter']:<30}{r['us_per_update']:>11}{r['rms_error']:>10}{r['measured_lag']:>6}"
+              f"{r['reported_lag']:>10}{str(r['matches_baseline']):>8}")
+
+
+if __name__ == "__main__":
+    main()
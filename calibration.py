@@ -1,8 +1,8 @@
 """
 Calibration logic: Dynamically determines ROM thresholds with minimal voice spam
 """
-import time
 from typing import TYPE_CHECKING
+from clock import SYSTEM_CLOCK
 from constants import CalibrationPhase, ExerciseConfig
 
 if TYPE_CHECKING:
@@ -10,8 +10,10 @@ if TYPE_CHECKING:
     from models import CalibrationData
 
 class CalibrationManager:
-    def __init__(self, pose_processor, data: 'CalibrationData', hold_time: int, safety_margin: int):
+    def __init__(self, pose_processor, data: 'CalibrationData', hold_time: int, safety_margin: int,
+                 clock=None):
         self.pose_processor = pose_processor
+        self.clock = clock or SYSTEM_CLOCK
         self.data = data
         self.hold_time = hold_time
         self.safety_margin = safety_margin
@@ -31,7 +33,7 @@ class CalibrationManager:
         # SINGLE CLEAR MESSAGE: Only triggers speech once at phase start
         self.data.message = f"Please fully EXTEND your {self.joint_name} joint."
         self.data.progress = 0
-        self.start_time = time.time()
+        self.start_time = self.clock.now()
         self.min_angle = 360
         self.max_angle = 0
         print(f"Starting calibration for: {self.exercise_name}")
@@ -41,7 +43,7 @@ class CalibrationManager:
         if not self.data.active:
             return False
 
-        angles = self.pose_processor.get_both_arm_angles(results)
+        angles = self.pose_processor.get_both_arm_angles(results, current_time)
         valid_angles = [a for a in angles.values() if a is not None]
 
         if not valid_angles:
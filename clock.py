@@ -0,0 +1,45 @@
+"""
+Injectable clocks: wall time for live sessions, frame-driven time for replays and offline scoring
+"""
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """Source of the current time in seconds (epoch-based for the system clock)"""
+
+    @abstractmethod
+    def now(self) -> float:
+        """Current time in seconds"""
+
+
+class SystemClock(Clock):
+    """Wall-clock time; the default for live sessions"""
+
+    def now(self) -> float:
+        return time.time()
+
+
+class SimulatedClock(Clock):
+    """
+    Time that only moves when told to, so recorded sessions run as fast as the CPU allows
+    while hold times and rep durations still follow the recorded timestamps.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def set(self, timestamp: float):
+        """Moves to a frame timestamp; time never runs backwards"""
+        if timestamp > self._now:
+            self._now = timestamp
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            self._now += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
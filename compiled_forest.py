@@ -0,0 +1,223 @@
+"""
+Array-compiled Random Forest: serves the form model without scikit-learn
+
+A fitted forest is flattened into one set of NumPy node arrays (all trees concatenated) and
+evaluated for every row and tree at once, one tree level per step. The arrays are cached in
+an .npz next to the pickled model, so a serving process only needs NumPy.
+
+Usage (compile and verify a model ahead of deployment):
+    python compiled_forest.py rehab_model.pkl
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import Optional
+
+import numpy as np
+
+from constants import FORM_PARITY_SAMPLES
+
+CACHE_VERSION = 1
+
+
+def file_fingerprint(path: str) -> str:
+    """Content hash of the source model, stored in the cache to detect a replaced .pkl"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compiled_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".forest.npz"
+
+
+class CompiledForest:
+    """
+    Flat node arrays for a classification forest. `children[i]` is (left, right) so a step is
+    one gather; leaves point to themselves, so every row takes the same number of steps.
+    `value` holds each leaf's class probabilities.
+    Exposes predict / predict_proba like the sklearn model it replaces.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, classes: np.ndarray, depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self._children_flat = children.ravel()
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = depth
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """Compiles a fitted RandomForestClassifier / ExtraTreesClassifier / DecisionTreeClassifier"""
+        trees = getattr(model, "estimators_", None) or [model]
+        if not hasattr(trees[0], "tree_") or getattr(trees[0], "n_outputs_", 1) != 1:
+            raise ValueError(f"Cannot compile {type(model).__name__}: expected a single-output tree classifier")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset, depth = 0, 0
+        for estimator in trees:
+            tree = estimator.tree_
+            n = tree.node_count
+            node_ids = np.arange(n, dtype=np.int32) + offset
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.stack([np.where(is_leaf, node_ids, tree.children_left + offset),
+                                      np.where(is_leaf, node_ids, tree.children_right + offset)], axis=1).astype(np.int32))
+            counts = tree.value[:, 0, :]
+            values.append(counts / counts.sum(axis=1, keepdims=True))
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += n
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.asarray(roots, dtype=np.int32),
+                   np.asarray(model.classes_), depth, int(model.n_features_in_))
+
+    # --- EVALUATION ---
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_trees) leaf node index reached by each row in each tree"""
+        # sklearn compares float32 inputs against float64 thresholds; do the same for exact parity
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        flat = X.ravel()
+        row_offsets = (np.arange(len(X)) * self.n_features_in_)[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_right = flat[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self._children_flat[2 * nodes + go_right]
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.value[self.leaves(X)].mean(axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children, self.value, self.roots))
+
+    # --- PARITY ---
+    def parity_samples(self, n: int = FORM_PARITY_SAMPLES, seed: int = 0) -> np.ndarray:
+        """
+        Random rows spanning each feature's split range, with half the values snapped onto
+        thresholds so the <= boundary is exercised
+        """
+        rng = np.random.default_rng(seed)
+        X = np.empty((n, self.n_features_in_), dtype=np.float64)
+        split = np.isfinite(self.threshold)
+        for f in range(self.n_features_in_):
+            cuts = self.threshold[split & (self.feature == f)]
+            lo, hi = (cuts.min(), cuts.max()) if len(cuts) else (0.0, 1.0)
+            margin = (hi - lo) * 0.1 + 1e-3
+            X[:, f] = rng.uniform(lo - margin, hi + margin, n)
+            if len(cuts):
+                snap = rng.random(n) < 0.5
+                X[snap, f] = rng.choice(cuts, snap.sum())
+        return X
+
+    def check_parity(self, model, X: Optional[np.ndarray] = None) -> int:
+        """Number of rows where this forest and `model` disagree (0 = exact match)"""
+        X = self.parity_samples() if X is None else np.asarray(X, dtype=np.float64)
+        return int(np.count_nonzero(self.predict(X) != model.predict(X)))
+
+    # --- CACHE ---
+    def save(self, path: str, source_fingerprint: str = ""):
+        """Writes to a temp file and renames it into place, so readers never see a partial cache"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, version=CACHE_VERSION, feature=self.feature, threshold=self.threshold,
+                         children=self.children, value=self.value, roots=self.roots,
+                         classes=self.classes_, depth=self.depth, n_features=self.n_features_in_,
+                         source=source_fingerprint)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, source_fingerprint: Optional[str] = None) -> Optional["CompiledForest"]:
+        """Loads a cache file; None if it is missing, from another version or another source model"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != CACHE_VERSION:
+                    return None
+                if source_fingerprint is not None and str(data["source"]) != source_fingerprint:
+                    return None
+                return cls(data["feature"], data["threshold"], data["children"], data["value"],
+                           data["roots"], data["classes"], int(data["depth"]), int(data["n_features"]))
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile) as e:
+            print(f"⚠️ Ignoring unreadable compiled forest {path}: {e}")
+            return None
+
+
+def load_forest(model_path: str, verify: bool = True):
+    """
+    The form model ready for serving: the cached compiled forest when it matches the .pkl,
+    otherwise the .pkl is unpickled, compiled, parity-checked and cached. Falls back to the
+    sklearn model itself when it cannot be compiled or does not match exactly.
+    """
+    cache_path = compiled_path(model_path)
+    fingerprint = file_fingerprint(model_path) if os.path.exists(model_path) else None
+    forest = CompiledForest.load(cache_path, fingerprint)
+    if forest is not None:
+        print(f"✅ Compiled form model loaded: {cache_path}")
+        return forest
+    if fingerprint is None:
+        return None
+
+    import joblib
+    model = joblib.load(model_path)
+    try:
+        forest = CompiledForest.from_sklearn(model)
+    except (ValueError, AttributeError) as e:
+        print(f"⚠️ Serving sklearn model ({e})")
+        return model
+
+    if verify:
+        mismatches = forest.check_parity(model)
+        if mismatches:
+            print(f"⚠️ Compiled forest disagrees with the model on {mismatches} samples; serving sklearn model")
+            return model
+    try:
+        forest.save(cache_path, fingerprint)
+    except OSError as e:
+        print(f"⚠️ Could not cache compiled forest: {e}")
+    print(f"✅ Compiled form model: {len(forest.roots)} trees, {len(forest.feature)} nodes, "
+          f"{forest.nbytes / 1024:.0f} KiB")
+    return forest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a Random Forest form model to NumPy arrays")
+    parser.add_argument("model", help="Path to the joblib-pickled model (.pkl)")
+    parser.add_argument("--samples", type=int, default=FORM_PARITY_SAMPLES, help="Parity check rows")
+    args = parser.parse_args()
+
+    import joblib
+    model = joblib.load(args.model)
+    forest = CompiledForest.from_sklearn(model)
+    mismatches = forest.check_parity(model, forest.parity_samples(args.samples))
+    if mismatches:
+        print(f"❌ Parity check failed on {mismatches}/{args.samples} samples; cache not written")
+        return
+    forest.save(compiled_path(args.model), file_fingerprint(args.model))
+    print(f"✅ {compiled_path(args.model)}: {len(forest.roots)} trees, {len(forest.feature)} nodes, "
+          f"depth {forest.depth}, parity {args.samples}/{args.samples}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
 """
 Configuration constants and enumerations
 """
-from enum import Enum
+from enum import Enum, IntEnum
 from dataclasses import dataclass, field
 from typing import List
-import mediapipe as mp # Required for easy access to landmark indices
 
 
 class WorkoutPhase(Enum):
@@ -56,9 +55,46 @@ class ExerciseConfig:
     ai_features_landmarks: List[int] = field(default_factory=list)
 
 
+class PoseLandmark(IntEnum):
+    """MediaPipe Pose landmark indices (same values as mp.solutions.pose.PoseLandmark, without importing mediapipe)"""
+    NOSE = 0
+    LEFT_EYE_INNER = 1
+    LEFT_EYE = 2
+    LEFT_EYE_OUTER = 3
+    RIGHT_EYE_INNER = 4
+    RIGHT_EYE = 5
+    RIGHT_EYE_OUTER = 6
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    MOUTH_LEFT = 9
+    MOUTH_RIGHT = 10
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_PINKY = 17
+    RIGHT_PINKY = 18
+    LEFT_INDEX = 19
+    RIGHT_INDEX = 20
+    LEFT_THUMB = 21
+    RIGHT_THUMB = 22
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+    LEFT_HEEL = 29
+    RIGHT_HEEL = 30
+    LEFT_FOOT_INDEX = 31
+    RIGHT_FOOT_INDEX = 32
+
+
 # --- EXERCISE PRESETS ---
 
-mp_pose = mp.solutions.holistic.PoseLandmark
+mp_pose = PoseLandmark
 
 EXERCISE_PRESETS = {
     "Bicep Curl": ExerciseConfig(
@@ -143,4 +179,105 @@ REP_HYSTERESIS_MARGIN = 5   # degrees: margin for state transition stability
 DEFAULT_CONTRACTED_THRESHOLD = 50
 DEFAULT_EXTENDED_THRESHOLD = 160
 DEFAULT_SAFE_ANGLE_MIN = 30
-DEFAULT_SAFE_ANGLE_MAX = 175
\ No newline at end of file
+DEFAULT_SAFE_ANGLE_MAX = 175
+
+# Streaming pipeline
+PIPELINE_QUEUE_SIZE = 1       # frames held between stages (latest-value, stale frames dropped)
+PIPELINE_IDLE_SLEEP = 0.005   # seconds to back off when the camera has no frame ready
+
+# Multi-session registry
+MAX_CONCURRENT_SESSIONS = 8   # live sessions per server process
+SESSION_IDLE_TIMEOUT = 300    # seconds without activity before a session is evicted
+SESSION_REAPER_INTERVAL = 30  # seconds between idle-eviction sweeps
+
+# Client-side landmark ingestion
+POSE_LANDMARK_COUNT = 33      # MediaPipe Pose / Holistic body landmarks
+HAND_LANDMARK_COUNT = 21      # MediaPipe Hands landmarks per hand
+MAX_INGEST_BATCH = 120        # frames accepted per HTTP / Socket.IO batch
+
+# Offline batch processing
+BATCH_VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Frame sources
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 30
+CAMERA_FOURCC = "MJPG"        # compressed USB transfer; avoids YUYV bandwidth limits at 30 FPS
+CAMERA_BUFFER_SIZE = 1        # driver-side frames queued; 1 means always the freshest frame
+CAMERA_PROBE_DEVICES = 2      # device indices tried by the (cached) camera probe
+
+# Holistic model pool
+HOLISTIC_POOL_SIZE = 2        # models pre-created and warmed at server startup
+HOLISTIC_POOL_MAX = 8         # hard cap on live Holistic instances (bounds memory)
+HOLISTIC_LEASE_TIMEOUT = 5    # seconds a session start waits for a free model
+
+# Inference mode
+INFERENCE_MODE = "holistic"   # "holistic" (pose + face + hands) or "pose_hands" (pose + periodic wrist-ROI hands)
+HAND_INFERENCE_INTERVAL = 5   # run the hand model every Nth frame in "pose_hands" mode (0 disables hands)
+HAND_ROI_SCALE = 2.0          # hand crop side as a multiple of forearm length
+HAND_ROI_MIN_SIZE = 64        # pixels
+
+# Adaptive inference rate
+ADAPTIVE_INFERENCE = True     # skip inference on still frames and extrapolate landmarks
+ADAPTIVE_MAX_INTERVAL = 4     # at most every 4th frame is inferred while still / counting down
+ADAPTIVE_STILL_VELOCITY = 30  # degrees/second below which the tracked joint counts as still
+ADAPTIVE_CPU_BUDGET = 0.5     # seconds of inference allowed per wall-clock second, per session
+ADAPTIVE_MAX_EXTRAPOLATION = 0.25  # seconds; older landmarks are never extrapolated
+ADAPTIVE_ACTIVE_STILL_TIME = 0.5  # seconds of stillness before backing off during reps (turnarounds are shorter)
+
+# Live state stream (Socket.IO)
+STATE_EMIT_HZ = 15            # max workout_update / workout_delta emits per second per session
+STATE_FLOAT_PRECISION = 4     # decimals kept for landmark coordinates in delta payloads
+
+# Binary wire format
+WIRE_LANDMARK_MIN = -0.5      # normalized coordinate range covered by uint16 quantization
+WIRE_LANDMARK_MAX = 1.5       # (~3e-5 resolution; landmarks may sit slightly off-frame)
+
+# Angle smoothing filters
+SMOOTHING_FILTER = "median_ema"   # "median_ema" (streaming median + EMA), "one_euro" or "kalman"
+SMOOTHING_EMA_ALPHA = 0.5     # EMA weight of the newest median
+SMOOTHING_FRAME_RATE = 30     # nominal frames/second assumed by the filters when updates carry no timestamps
+ONE_EURO_MIN_CUTOFF = 1.0     # Hz: cutoff while the joint is still
+ONE_EURO_BETA = 0.05          # cutoff increase per degree/second of movement
+ONE_EURO_D_CUTOFF = 1.0       # Hz: cutoff of the speed estimate
+KALMAN_PROCESS_NOISE = 4.0    # degrees^2 per frame of unmodelled acceleration
+KALMAN_MEASUREMENT_NOISE = 16.0   # degrees^2 of landmark jitter
+
+# Predictive rep transitions
+REP_PREDICTIVE = False        # count on predicted threshold crossings (pairs best with "kalman"/"one_euro")
+REP_PREDICTIVE_FILTER = "kalman"  # smoothing filter used by predictive sessions unless one is given
+REP_PREDICTION_HORIZON = 0.1  # seconds of velocity look-ahead when classifying the stage
+REP_PREDICTIVE_HOLD_TIME = 0.03   # seconds a predicted stage must persist (vs 0.1 s normally)
+
+# Session history storage
+HISTORY_CHUNK_SIZE = 4096     # rows per preallocated chunk (~2 min at 30 fps)
+HISTORY_MEMORY_CHUNKS = 4     # full chunks kept in RAM per column before spilling to disk (0 = never spill)
+HISTORY_SPILL_DIR = None      # directory for spill files (None = system temp dir)
+
+# Landmark recordings
+RECORDING_DIR = "recordings"  # where /start_tracking writes recordings when asked to record
+RECORDING_CHUNK_FRAMES = 256  # frames buffered per chunk before it is written
+RECORDING_COMPRESS = True     # zlib-compress chunks (~4x smaller; uncompressed chunks are mmap'd directly)
+
+# Frame profiling
+PROFILING_ENABLED = True      # per-stage latency histograms (/metrics, /api/debug/profile)
+PROFILE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)  # seconds
+PROFILE_WINDOW = 1024         # recent samples per stage kept for rolling percentiles
+
+# Form-quality inference
+FORM_BATCH_MAX_SIZE = 64      # feature vectors predicted in one model call
+FORM_BATCH_MAX_WAIT = 0.01    # seconds the worker waits for more sessions to join a batch
+FORM_PARITY_SAMPLES = 2048    # rows checked against the sklearn model before a compiled forest is served
+FORM_FEATURE_COUNT = 16       # x, y of the 8 ExerciseConfig.ai_features_landmarks
+
+# Form model registry
+FORM_MODEL_DIR = "form_models"    # <dir>/<exercise key>/<version>.pkl, plus <dir>/default/ for all exercises
+FORM_MODEL_POLL_INTERVAL = 5.0    # seconds between scans for new model versions
+FORM_MODEL_HOLDOUT = "holdout.npz"    # per-directory validation set: X (n, 16), y (n,)
+FORM_MODEL_MIN_ACCURACY = 0.8     # a new version must reach this holdout accuracy...
+FORM_MODEL_MAX_REGRESSION = 0.02  # ...and lose at most this much accuracy against the serving version
+
+# Server startup
+MONGO_CONNECT_RETRIES = 0     # background connection attempts before giving up (0 = keep retrying)
+MONGO_RETRY_DELAY = 1.0       # seconds before the first retry; doubles per attempt
+MONGO_RETRY_MAX_DELAY = 30.0  # cap on the retry backoff
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Off-thread, micro-batched form-quality inference shared by every live session
+"""
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from constants import FORM_BATCH_MAX_SIZE, FORM_BATCH_MAX_WAIT
+from profiling import NODE_PROFILER, perf
+
+
+class FormInferenceService:
+    """
+    Collects feature vectors from all sessions and predicts them in one model call per exercise
+    on a worker thread, then hands each prediction to the session's callback. The frame loop only
+    queues a request and never waits on the model. Each session has at most one pending request:
+    a newer one replaces it, since only the latest pose matters for the latch.
+    `predict_batch(features, exercise_name)` defaults to AIEngine.predict_form_batch.
+    """
+
+    def __init__(self, predict_batch: Optional[Callable[[np.ndarray, Optional[str]], np.ndarray]] = None,
+                 max_batch: int = FORM_BATCH_MAX_SIZE, max_wait: float = FORM_BATCH_MAX_WAIT,
+                 profiler=NODE_PROFILER):
+        if predict_batch is None:
+            from ai_engine import AIEngine
+            predict_batch = AIEngine.predict_form_batch
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.profiler = profiler
+
+        self._pending: Dict[Hashable, Tuple[np.ndarray, Callable[[int], None], Optional[str]]] = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self.requests = 0
+        self.superseded = 0
+        self.batches = 0
+        self.predicted = 0
+        self.largest_batch = 0
+
+    # --- LIFECYCLE ---
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="form-inference", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stops the worker; pending requests are dropped"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # --- REQUESTS ---
+    def submit(self, key: Hashable, features: np.ndarray, callback: Callable[[int], None],
+               exercise_name: Optional[str] = None) -> bool:
+        """
+        Queues one feature vector for `exercise_name`'s model; `callback(prediction)` runs later
+        on the worker thread.
+        Returns False when the service is not running (callers fall back to a direct call).
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            self.requests += 1
+            if key in self._pending:
+                self.superseded += 1
+            self._pending[key] = (np.array(features, dtype=np.float64), callback, exercise_name)
+            self._cond.notify()
+        return True
+
+    def cancel(self, key: Hashable):
+        """Drops a session's pending request (e.g. when it stops)"""
+        with self._cond:
+            self._pending.pop(key, None)
+
+    def _take_batch(self):
+        """Waits for work, then up to `max_wait` for more sessions to join the batch"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or not self._running)
+            if not self._running:
+                return None
+            if len(self._pending) < self.max_batch and self.max_wait > 0:
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_batch or not self._running,
+                                    self.max_wait)
+            keys = list(self._pending)[:self.max_batch]
+            return [self._pending.pop(k) for k in keys]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            groups: Dict[Optional[str], list] = {}
+            for request in batch:
+                groups.setdefault(request[2], []).append(request)
+
+            for exercise_name, requests in groups.items():
+                features = np.stack([f for f, _, _ in requests])
+                start = perf()
+                try:
+                    predictions = np.asarray(self.predict_batch(features, exercise_name)).tolist()
+                except Exception as e:
+                    print(f"⚠️ Form inference batch failed: {e}")
+                    predictions = [1] * len(requests)
+                self.profiler.record("form_batch", perf() - start)
+
+                self.batches += 1
+                self.predicted += len(requests)
+                self.largest_batch = max(self.largest_batch, len(requests))
+                for (_, callback, _), prediction in zip(requests, predictions):
+                    try:
+                        callback(int(prediction))
+                    except Exception as e:
+                        print(f"⚠️ Form inference callback failed: {e}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "running": self._running,
+            "pending": pending,
+            "requests": self.requests,
+            "superseded": self.superseded,
+            "batches": self.batches,
+            "predicted": self.predicted,
+            "mean_batch": round(self.predicted / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
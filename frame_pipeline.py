@@ -0,0 +1,253 @@
+"""
+Staged capture / inference / encode pipeline for the live video loop
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+from constants import PIPELINE_QUEUE_SIZE, PIPELINE_IDLE_SLEEP
+from profiling import perf
+
+
+class LatestValueQueue:
+    """Bounded hand-off between stages that drops stale items instead of blocking"""
+
+    def __init__(self, maxsize: int = 1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        """Stores an item, discarding the oldest one when the queue is full"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None):
+        """Returns the oldest pending item, or None on timeout / close"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self) -> None:
+        """Wakes up every waiting consumer; further puts are ignored"""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+class MjpegBroadcaster:
+    """
+    Fans each encoded frame out to every viewer (patient, therapist, ...).
+    Each subscriber has its own latest-value queue, so a slow client only drops its own frames
+    and never blocks the pipeline or other viewers.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(self) -> LatestValueQueue:
+        q = LatestValueQueue(self.queue_size)
+        with self._lock:
+            if self._closed:
+                q.close()
+            else:
+                self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: LatestValueQueue) -> None:
+        with self._lock:
+            self._subscribers.discard(q)
+        q.close()
+
+    def publish(self, jpeg: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            q.put(jpeg)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            subscribers, self._subscribers = self._subscribers, set()
+        for q in subscribers:
+            q.close()
+
+    @property
+    def viewer_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+class FramePipeline:
+    """
+    Runs a WorkoutSession as three overlapping stages:
+    capture (camera I/O) -> inference (MediaPipe + rep logic) -> encode (JPEG + state emit).
+    Stages are joined by latest-value queues so a slow stage skips frames rather than lagging.
+    For headless sessions the encode stage only emits state; no JPEG is produced.
+    Each frame is encoded once and broadcast to every viewer; with no viewers, encoding is skipped.
+    Inference holds `lock` (the owning ManagedSession's lock) while it mutates the session,
+    so request handlers that take the same lock never see a half-processed frame.
+    `on_activity` is called whenever a state update or frame actually reaches a listener,
+    which keeps sessions watched only over Socket.IO (e.g. headless ones) from looking idle.
+    """
+
+    def __init__(self, session, on_state: Optional[Callable[[dict], None]] = None,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 state_due: Optional[Callable[[], bool]] = None,
+                 state_fn: Optional[Callable[[], dict]] = None,
+                 lock: Optional[threading.RLock] = None,
+                 on_activity: Optional[Callable[[], None]] = None):
+        self.session = session
+        self.on_activity = on_activity
+        self.lock = lock or threading.RLock()
+        self.on_state = on_state
+        # State is only serialized when the emitter wants it (rate limit / listeners)
+        self.state_due = state_due
+        self.state_fn = state_fn or session.get_state_dict
+
+        self.capture_queue = LatestValueQueue(queue_size)
+        self.encode_queue = LatestValueQueue(queue_size)
+        self.broadcaster = MjpegBroadcaster(queue_size)
+
+        self._running = False
+        self._threads = []
+        self.inference_thread = None   # set by stop() when the inference stage outlived the join
+
+    def start(self):
+        """Spawns the stage threads"""
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True),
+            threading.Thread(target=self._encode_loop, name="pipeline-encode", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = 2.0) -> bool:
+        """
+        Stops all stages and waits up to `timeout` for each to exit.
+        Returns False when the inference stage is still running (e.g. stuck inside the model),
+        in which case `inference_thread` is kept so the caller can wait for it.
+        """
+        self._running = False
+        for q in (self.capture_queue, self.encode_queue):
+            q.close()
+        self.broadcaster.close()
+        for t in self._threads:
+            if t is not threading.current_thread():
+                t.join(timeout)
+        inference = self._threads[1] if self._threads else None
+        self.inference_thread = inference if inference is not None and inference.is_alive() else None
+        self._threads = []
+        return self.inference_thread is None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # --- STAGES ---
+    def _capture_loop(self):
+        while self._running:
+            start = perf()
+            success, frame = self.session.read_frame()
+            if not success or frame is None:
+                time.sleep(PIPELINE_IDLE_SLEEP)
+                continue
+            self.session.profiler.since("read", start)
+            # perf_counter stamp: end-to-end latency is wall time even on simulated clocks
+            self.capture_queue.put((perf(), frame))
+
+    def _inference_loop(self):
+        while self._running:
+            item = self.capture_queue.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, frame = item
+            with self.lock:
+                if not self._running:
+                    break
+                try:
+                    image, valid = self.session.process_image(frame)
+                except Exception as e:
+                    print(f"⚠️ Pipeline inference error: {e}")
+                    continue
+                if not valid:
+                    continue
+                state = None
+                if self.on_state is not None and (self.state_due is None or self.state_due()):
+                    start = perf()
+                    state = self.state_fn()
+                    self.session.profiler.since("state", start)
+            if image is None and state is None:
+                continue
+            self.encode_queue.put((captured_at, image, state))
+
+    def _encode_loop(self):
+        import cv2
+        while self._running:
+            item = self.encode_queue.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, image, state = item
+            profiler = self.session.profiler
+
+            if state is not None:
+                start = perf()
+                try:
+                    self.on_state(state)
+                except Exception as e:
+                    print(f"⚠️ Pipeline emit error: {e}")
+                profiler.since("emit", start)
+
+            delivered = state is not None
+            if image is not None and self.broadcaster.viewer_count > 0:
+                start = perf()
+                ret, buffer = cv2.imencode(".jpg", image)
+                if ret:
+                    self.broadcaster.publish(buffer.tobytes())
+                    delivered = True
+                profiler.since("encode", start)
+
+            # Capture to emitted state / published frame
+            if delivered:
+                profiler.record("end_to_end", perf() - captured_at)
+                if self.on_activity is not None:
+                    self.on_activity()
+
+    # --- CONSUMER ---
+    def mjpeg_frames(self) -> Iterator[bytes]:
+        """Yields multipart MJPEG chunks for one viewer until the pipeline stops or the client leaves"""
+        viewer = self.broadcaster.subscribe()
+        try:
+            while self._running and not viewer.closed:
+                jpeg = viewer.get(timeout=0.5)
+                if jpeg is None:
+                    continue
+                yield (
+                    b"--frame\r\n"
+                    b"Content-Type: image/jpeg\r\n\r\n"
+                    + jpeg
+                    + b"\r\n"
+                )
+        finally:
+            self.broadcaster.unsubscribe(viewer)
@@ -0,0 +1,280 @@
+"""
+Pluggable frame sources: live camera, recorded video, image sequences and synthetic frames
+"""
+import glob
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from constants import (CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAMERA_FOURCC,
+                       CAMERA_BUFFER_SIZE, CAMERA_PROBE_DEVICES)
+
+_probe_lock = threading.Lock()
+_probed_index: Optional[int] = None
+
+
+def probe_camera_index(max_devices: int = CAMERA_PROBE_DEVICES, refresh: bool = False) -> int:
+    """
+    Detects the first available camera index. A successful probe is cached for the process,
+    so devices are only opened and released once rather than on every session start;
+    when no device answers, 0 is returned uncached and the next call probes again.
+    """
+    global _probed_index
+    import cv2
+    with _probe_lock:
+        if _probed_index is not None and not refresh:
+            return _probed_index
+        _probed_index = None
+        for i in range(max_devices):
+            cap = cv2.VideoCapture(i)
+            if cap.isOpened():
+                cap.release()
+                _probed_index = i
+                break
+        return _probed_index if _probed_index is not None else 0
+
+
+class FrameSource(ABC):
+    """Interface for anything that yields BGR frames to a WorkoutSession"""
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Acquires the underlying device/file; returns False if unavailable"""
+
+    @abstractmethod
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Returns (success, BGR frame) like cv2.VideoCapture.read"""
+
+    def release(self) -> None:
+        """Frees the underlying device/file"""
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        """True while frames can be read"""
+
+    @property
+    def fps(self) -> float:
+        return 30.0
+
+    @property
+    def timestamp(self) -> Optional[float]:
+        """Media time (seconds) of the last frame read, or None for live sources"""
+        return None
+
+
+class CameraSource(FrameSource):
+    """Live camera tuned for low latency: MJPG transfer and a 1-frame driver buffer"""
+
+    def __init__(self, index: Optional[int] = None, width: int = CAMERA_WIDTH,
+                 height: int = CAMERA_HEIGHT, fps: int = CAMERA_FPS,
+                 fourcc: Optional[str] = CAMERA_FOURCC, buffer_size: int = CAMERA_BUFFER_SIZE):
+        self.index = index
+        self.width = width
+        self.height = height
+        self._fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self._cap = None
+
+    def open(self) -> bool:
+        import cv2
+        if self.index is not None:
+            self._cap = cv2.VideoCapture(self.index)
+        else:
+            self._cap = cv2.VideoCapture(probe_camera_index())
+            if not self._cap.isOpened():
+                # The cached device may have been unplugged or renumbered
+                self._cap.release()
+                self._cap = cv2.VideoCapture(probe_camera_index(refresh=True))
+        if not self._cap.isOpened():
+            return False
+
+        if self.fourcc:
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._cap.set(cv2.CAP_PROP_FPS, self._fps)
+        # Keep only the freshest frame queued in the driver
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return True
+
+    def read(self):
+        if self._cap is None:
+            return False, None
+        return self._cap.read()
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    @property
+    def fps(self) -> float:
+        return float(self._fps)
+
+
+class VideoFileSource(FrameSource):
+    """
+    Recorded video file; timestamps are the container's presentation times (so variable
+    frame rate footage keeps its real spacing), not wall time
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cap = None
+        self._fps = 30.0
+        self._frame_idx = -1
+        self._timestamp: Optional[float] = None
+
+    def open(self) -> bool:
+        import cv2
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            return False
+        self._fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._frame_idx = -1
+        self._timestamp = None
+        return True
+
+    def read(self):
+        if self._cap is None:
+            return False, None
+        import cv2
+        success, frame = self._cap.read()
+        if success:
+            self._frame_idx += 1
+            position = self._cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if position <= 0.0 and self._frame_idx > 0:
+                # Backend without position support: fall back to the nominal frame rate
+                position = self._frame_idx / self._fps
+            self._timestamp = position
+        return success, frame
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_idx + 1
+
+    @property
+    def timestamp(self) -> Optional[float]:
+        return self._timestamp
+
+
+class ImageSequenceSource(FrameSource):
+    """Ordered still images (a directory or glob pattern) played back at a fixed rate"""
+
+    IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, pattern: str, fps: float = 30.0):
+        self.pattern = pattern
+        self._fps = fps
+        self._paths: List[str] = []
+        self._frame_idx = -1
+
+    def open(self) -> bool:
+        if os.path.isdir(self.pattern):
+            paths = [os.path.join(self.pattern, n) for n in os.listdir(self.pattern)]
+        else:
+            paths = glob.glob(self.pattern)
+        self._paths = sorted(p for p in paths if p.lower().endswith(self.IMAGE_EXTENSIONS))
+        self._frame_idx = -1
+        return bool(self._paths)
+
+    def read(self):
+        next_idx = self._frame_idx + 1
+        if next_idx >= len(self._paths):
+            return False, None
+        import cv2
+        frame = cv2.imread(self._paths[next_idx])
+        if frame is None:
+            return False, None
+        self._frame_idx = next_idx
+        return True, frame
+
+    def release(self):
+        self._paths = []
+
+    def is_opened(self) -> bool:
+        return bool(self._paths)
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def timestamp(self) -> Optional[float]:
+        return self._frame_idx / self._fps if self._frame_idx >= 0 else None
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames for tests and benchmarks without a camera"""
+
+    def __init__(self, width: int = CAMERA_WIDTH, height: int = CAMERA_HEIGHT, fps: float = 30.0,
+                 num_frames: Optional[int] = None, realtime: bool = False):
+        self.width = width
+        self.height = height
+        self._fps = fps
+        self.num_frames = num_frames
+        self.realtime = realtime
+        self._frame_idx = -1
+        self._opened = False
+        self._frame = None
+        self._last_emit = 0.0
+
+    def open(self) -> bool:
+        self._frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._frame_idx = -1
+        self._opened = True
+        return True
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self.num_frames is not None and self._frame_idx + 1 >= self.num_frames:
+            return False, None
+
+        if self.realtime:
+            wait = self._last_emit + 1.0 / self._fps - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_emit = time.time()
+
+        self._frame_idx += 1
+        # A bar sweeping across a black frame, so consecutive frames differ
+        self._frame.fill(0)
+        x = (self._frame_idx * 8) % self.width
+        self._frame[:, x:x + 16] = 255
+        return True, self._frame.copy()
+
+    def release(self):
+        self._opened = False
+        self._frame = None
+
+    def is_opened(self) -> bool:
+        return self._opened
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def timestamp(self) -> Optional[float]:
+        return self._frame_idx / self._fps if self._frame_idx >= 0 else None
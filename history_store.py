@@ -0,0 +1,126 @@
+"""
+Columnar, bounded-memory storage for per-frame session history
+"""
+import os
+import tempfile
+import weakref
+from typing import List, Optional
+
+import numpy as np
+
+from constants import HISTORY_CHUNK_SIZE, HISTORY_MEMORY_CHUNKS, HISTORY_SPILL_DIR
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class HistoryColumn:
+    """
+    Append-only column of numbers stored in preallocated NumPy chunks.
+
+    At most `memory_chunks` full chunks stay in RAM; older ones are appended to a spill file
+    and read back through a read-only memmap, so resident memory stays flat however long the
+    session runs. `memory_chunks=0` keeps everything in memory. Supports the list operations
+    the session uses: append, len, truthiness, indexing (incl. negative) and slicing.
+    """
+
+    def __init__(self, dtype, chunk_size: int = HISTORY_CHUNK_SIZE,
+                 memory_chunks: int = HISTORY_MEMORY_CHUNKS, spill_dir: Optional[str] = HISTORY_SPILL_DIR):
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = max(1, chunk_size)
+        self.memory_chunks = memory_chunks
+        self.spill_dir = spill_dir
+        self._spill_path = None
+        self._finalizer = None
+        self._disk_view = None
+        self.clear()
+
+    # --- WRITING ---
+    def append(self, value):
+        if self._fill == self.chunk_size:
+            self._seal_chunk()
+        self._current[self._fill] = value
+        self._fill += 1
+
+    def _seal_chunk(self):
+        self._chunks.append(self._current)
+        self._current = np.empty(self.chunk_size, dtype=self.dtype)
+        self._fill = 0
+        if self.memory_chunks and len(self._chunks) > self.memory_chunks:
+            self._spill(self._chunks.pop(0))
+
+    def _spill(self, chunk: np.ndarray):
+        if self._spill_path is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix="history_", suffix=".bin", dir=self.spill_dir)
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove_file, self._spill_path)
+        with open(self._spill_path, "ab") as f:
+            f.write(chunk.tobytes())
+        self._spilled += len(chunk)
+        self._disk_view = None   # remapped on next read
+
+    def clear(self):
+        """Drops all values and deletes the spill file"""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._spill_path = None
+        self._finalizer = None
+        self._disk_view = None
+        self._spilled = 0
+        self._chunks: List[np.ndarray] = []
+        self._current = np.empty(self.chunk_size, dtype=self.dtype)
+        self._fill = 0
+
+    close = clear
+
+    # --- READING ---
+    def __len__(self) -> int:
+        return self._spilled + len(self._chunks) * self.chunk_size + self._fill
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def _disk(self) -> np.ndarray:
+        if self._disk_view is None:
+            self._disk_view = np.memmap(self._spill_path, dtype=self.dtype, mode="r", shape=(self._spilled,))
+        return self._disk_view
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_numpy()[index]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        if index < self._spilled:
+            return self._disk()[index].item()
+        index -= self._spilled
+        chunk, offset = divmod(index, self.chunk_size)
+        source = self._chunks[chunk] if chunk < len(self._chunks) else self._current
+        return source[offset].item()
+
+    def __iter__(self):
+        return iter(self.to_numpy().tolist())
+
+    def to_numpy(self) -> np.ndarray:
+        """All values as one array (spilled part read through the memmap)"""
+        parts = []
+        if self._spilled:
+            parts.append(self._disk())
+        parts.extend(self._chunks)
+        parts.append(self._current[:self._fill])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Resident bytes held by in-memory chunks"""
+        return (len(self._chunks) + 1) * self.chunk_size * self.dtype.itemsize
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
@@ -0,0 +1,158 @@
+"""
+Client-side landmark ingestion: the browser runs pose estimation and the server only counts reps
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from constants import POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT, MAX_INGEST_BATCH
+
+
+class IngestedLandmark(NamedTuple):
+    """Mirrors the attributes PoseProcessor reads from a MediaPipe landmark"""
+    x: float
+    y: float
+    z: float = 0.0
+    visibility: float = 1.0
+
+    def HasField(self, name: str) -> bool:
+        """Protobuf-style presence check used by mp_drawing.draw_landmarks"""
+        return name == "visibility"
+
+
+class IngestedLandmarkList:
+    """Stand-in for a MediaPipe NormalizedLandmarkList (exposes `.landmark`)"""
+    __slots__ = ("landmark",)
+
+    def __init__(self, landmark: List[IngestedLandmark]):
+        self.landmark = landmark
+
+
+class ArrayLandmarkList:
+    """
+    Landmark list backed by an (N, 4) float32 array of x, y, z, visibility.
+    PoseProcessor reads `.array` directly; `.landmark` objects are only built if something asks.
+    """
+    __slots__ = ("array", "_landmark")
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self._landmark = None
+
+    @property
+    def landmark(self) -> List[IngestedLandmark]:
+        if self._landmark is None:
+            self._landmark = [IngestedLandmark(*row) for row in self.array.tolist()]
+        return self._landmark
+
+
+class IngestedResults:
+    """Stand-in for MediaPipe Holistic results built from client-supplied landmarks"""
+    __slots__ = ("pose_landmarks", "right_hand_landmarks", "left_hand_landmarks")
+
+    def __init__(self, pose_landmarks=None, right_hand_landmarks=None, left_hand_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+
+
+def _parse_point(point) -> IngestedLandmark:
+    """Accepts either [x, y, z?, visibility?] or {"x", "y", "z", "visibility"}"""
+    if isinstance(point, dict):
+        return IngestedLandmark(
+            float(point["x"]), float(point["y"]),
+            float(point.get("z", 0.0)), float(point.get("visibility", 1.0))
+        )
+    values = [float(v) for v in point]
+    if len(values) < 2:
+        raise ValueError("Landmark needs at least x and y")
+    return IngestedLandmark(*values[:4])
+
+
+def _parse_landmark_list(points, expected: int, name: str) -> Optional[IngestedLandmarkList]:
+    if not points:
+        return None
+    if len(points) != expected:
+        raise ValueError(f"{name} must contain {expected} landmarks, got {len(points)}")
+    return IngestedLandmarkList([_parse_point(p) for p in points])
+
+
+def _parse_pose_array(points) -> Optional[ArrayLandmarkList]:
+    """Pose landmarks go straight into an array; [[x, y, z, v], ...] payloads skip the per-point parse"""
+    if not points:
+        return None
+    if len(points) != POSE_LANDMARK_COUNT:
+        raise ValueError(f"landmarks must contain {POSE_LANDMARK_COUNT} landmarks, got {len(points)}")
+
+    array = np.zeros((POSE_LANDMARK_COUNT, 4), dtype=np.float32)
+    array[:, 3] = 1.0
+    try:
+        values = np.asarray(points, dtype=np.float32)
+    except (TypeError, ValueError):
+        values = None   # dict points or ragged rows
+
+    if values is not None and values.ndim == 2 and values.shape[1] >= 2:
+        columns = min(values.shape[1], 4)
+        array[:, :columns] = values[:, :columns]
+    else:
+        for i, point in enumerate(points):
+            array[i] = _parse_point(point)
+    return ArrayLandmarkList(array)
+
+
+def parse_frame(frame: dict) -> Tuple[Optional[float], IngestedResults]:
+    """
+    Parses one client frame: {"t": <ms since epoch>, "landmarks": [33 points],
+    "right_hand": [21 points]?, "left_hand": [21 points]?}.
+    Returns (timestamp in seconds or None, results).
+    """
+    if not isinstance(frame, dict):
+        raise ValueError("Frame must be an object")
+
+    timestamp = frame.get("t")
+    if timestamp is not None:
+        timestamp = float(timestamp) / 1000.0
+
+    results = IngestedResults(
+        pose_landmarks=_parse_pose_array(frame.get("landmarks")),
+        right_hand_landmarks=_parse_landmark_list(frame.get("right_hand"), HAND_LANDMARK_COUNT, "right_hand"),
+        left_hand_landmarks=_parse_landmark_list(frame.get("left_hand"), HAND_LANDMARK_COUNT, "left_hand"),
+    )
+    return timestamp, results
+
+
+def ingest_frames(session, frames: List[dict]) -> int:
+    """
+    Feeds a batch of client frames into a WorkoutSession in timestamp order.
+    Client timestamps are re-based onto the server clock on first contact so that
+    relative spacing (and therefore hold times / rep durations) is preserved.
+    Only a single-frame push may omit "t" (it is stamped with the server time);
+    in a batch every frame needs one, or all but one would collapse onto the same instant.
+    Returns the number of frames processed.
+    """
+    if len(frames) > MAX_INGEST_BATCH:
+        raise ValueError(f"Batch too large (max {MAX_INGEST_BATCH} frames)")
+
+    parsed = [parse_frame(f) for f in frames]
+    if len(parsed) > 1 and any(client_time is None for client_time, _ in parsed):
+        raise ValueError('Every frame in a multi-frame batch needs a "t" timestamp')
+    now = session.clock.now()
+    parsed.sort(key=lambda item: item[0] if item[0] is not None else float("inf"))
+
+    processed = 0
+    for client_time, results in parsed:
+        if client_time is None:
+            current_time = now
+        else:
+            if session.client_time_offset is None:
+                session.client_time_offset = now - client_time
+            current_time = client_time + session.client_time_offset
+
+        # Drop late or duplicate frames instead of rewinding the rep state machine
+        if current_time <= session.last_ingest_time:
+            continue
+        session.last_ingest_time = current_time
+
+        if session.process_landmarks(results, current_time):
+            processed += 1
+    return processed
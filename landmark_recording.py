@@ -0,0 +1,286 @@
+"""
+Compact landmark recordings: capture what the pose model saw and replay it without MediaPipe
+
+File layout (little endian, every block 8-byte aligned so uncompressed chunks map straight
+into NumPy arrays):
+    header  "PLRC" u8 version, u8 flags, u16 pose count, u16 hand count, u16 name length,
+            f8 origin (session start time), exercise name (utf-8), zero padding
+    chunk*  "CHNK" u32 frames, u32 stored bytes, u32 raw bytes, payload, zero padding
+    payload times f8[n] | pose f4[n, 33, 4] | right hand f4[n, 21, 4] | left hand f4[n, 21, 4]
+            | presence u1[n] (bit 0 pose, bit 1 right hand, bit 2 left hand)
+Compressed files zlib-deflate each payload; chunks whose stored size equals the raw size are raw.
+
+Usage (replay without a camera or model):
+    python landmark_recording.py recordings/<session>.plr
+"""
+import argparse
+import json
+import mmap
+import struct
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from clock import SimulatedClock
+from constants import (POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT, RECORDING_CHUNK_FRAMES,
+                       RECORDING_COMPRESS, WorkoutPhase)
+from landmark_ingest import ArrayLandmarkList, IngestedResults
+from pose_processor import landmarks_to_array
+
+MAGIC = b"PLRC"
+CHUNK_MAGIC = b"CHNK"
+VERSION = 1
+FLAG_COMPRESSED = 0x01
+HEADER = struct.Struct("<4sBBHHHd")
+CHUNK_HEADER = struct.Struct("<4sIII")
+
+HAS_POSE, HAS_RIGHT_HAND, HAS_LEFT_HAND = 0x01, 0x02, 0x04
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+class LandmarkRecorder:
+    """Append-only writer; frames are buffered into preallocated chunk arrays and flushed per chunk"""
+
+    def __init__(self, path: str, exercise_name: str = "", origin: float = 0.0,
+                 compress: bool = RECORDING_COMPRESS, chunk_frames: int = RECORDING_CHUNK_FRAMES):
+        self.path = path
+        self.compress = compress
+        self.chunk_frames = max(1, chunk_frames)
+        self.frames_written = 0
+        self.bytes_written = 0
+
+        n = self.chunk_frames
+        self._times = np.zeros(n, dtype=np.float64)
+        self._pose = np.zeros((n, POSE_LANDMARK_COUNT, 4), dtype=np.float32)
+        self._right = np.zeros((n, HAND_LANDMARK_COUNT, 4), dtype=np.float32)
+        self._left = np.zeros((n, HAND_LANDMARK_COUNT, 4), dtype=np.float32)
+        self._presence = np.zeros(n, dtype=np.uint8)
+        self._fill = 0
+
+        name = exercise_name.encode("utf-8")
+        header = HEADER.pack(MAGIC, VERSION, FLAG_COMPRESSED if compress else 0,
+                             POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT, len(name), origin) + name
+        header += b"\0" * _pad(len(header))
+        self._file = open(path, "wb")
+        self._write(header)
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def record(self, timestamp: float, results, pose_array: Optional[np.ndarray] = None):
+        """
+        Buffers one frame; `pose_array` skips re-converting landmarks the session already packed.
+        Frames arriving after close() are ignored.
+        """
+        if self._file is None:
+            return
+        i = self._fill
+        presence = 0
+        self._times[i] = timestamp
+
+        if results.pose_landmarks:
+            if pose_array is None:
+                landmarks_to_array(results.pose_landmarks, out=self._pose[i])
+            else:
+                self._pose[i] = pose_array
+            presence |= HAS_POSE
+        else:
+            self._pose[i] = 0
+        for hand, target, flag in ((results.right_hand_landmarks, self._right, HAS_RIGHT_HAND),
+                                   (results.left_hand_landmarks, self._left, HAS_LEFT_HAND)):
+            if hand:
+                landmarks_to_array(hand, out=target[i])
+                presence |= flag
+            else:
+                target[i] = 0
+        self._presence[i] = presence
+
+        self._fill += 1
+        if self._fill == self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered frames as one chunk"""
+        n = self._fill
+        if n == 0 or self._file is None:
+            return
+        raw = b"".join((self._times[:n].tobytes(), self._pose[:n].tobytes(), self._right[:n].tobytes(),
+                        self._left[:n].tobytes(), self._presence[:n].tobytes()))
+        stored = zlib.compress(raw, 1) if self.compress else raw
+        if len(stored) >= len(raw):
+            stored = raw
+        self._write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, len(stored), len(raw)) + stored + b"\0" * _pad(len(stored)))
+        self._file.flush()
+        self.frames_written += n
+        self._fill = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "frames": self.frames_written + self._fill,
+                "bytes": self.bytes_written, "compressed": self.compress}
+
+
+class RecordingChunk:
+    """Arrays for one chunk; views into the mapped file when the chunk is uncompressed"""
+    __slots__ = ("times", "pose", "right_hand", "left_hand", "presence")
+
+    def __init__(self, buffer, frames: int, offset: int = 0):
+        pose_size = POSE_LANDMARK_COUNT * 4
+        hand_size = HAND_LANDMARK_COUNT * 4
+        self.times = np.frombuffer(buffer, np.float64, frames, offset)
+        offset += frames * 8
+        self.pose = np.frombuffer(buffer, np.float32, frames * pose_size, offset).reshape(frames, POSE_LANDMARK_COUNT, 4)
+        offset += frames * pose_size * 4
+        self.right_hand = np.frombuffer(buffer, np.float32, frames * hand_size, offset).reshape(frames, HAND_LANDMARK_COUNT, 4)
+        offset += frames * hand_size * 4
+        self.left_hand = np.frombuffer(buffer, np.float32, frames * hand_size, offset).reshape(frames, HAND_LANDMARK_COUNT, 4)
+        offset += frames * hand_size * 4
+        self.presence = np.frombuffer(buffer, np.uint8, frames, offset)
+
+    def results(self, i: int) -> IngestedResults:
+        """Holistic-style results for frame i (None where nothing was detected)"""
+        flags = self.presence[i]
+        return IngestedResults(
+            pose_landmarks=ArrayLandmarkList(self.pose[i]) if flags & HAS_POSE else None,
+            right_hand_landmarks=ArrayLandmarkList(self.right_hand[i]) if flags & HAS_RIGHT_HAND else None,
+            left_hand_landmarks=ArrayLandmarkList(self.left_hand[i]) if flags & HAS_LEFT_HAND else None,
+        )
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, pose_count, hand_count, name_len, self.origin = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a v{VERSION} landmark recording")
+        if (pose_count, hand_count) != (POSE_LANDMARK_COUNT, HAND_LANDMARK_COUNT):
+            raise ValueError(f"Unsupported landmark counts {pose_count}/{hand_count}")
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.exercise_name = self._map[HEADER.size:HEADER.size + name_len].decode("utf-8")
+
+        # Chunk index: (frames, payload offset, stored size, raw size); a truncated tail is ignored
+        self._index: List[Tuple[int, int, int, int]] = []
+        offset = HEADER.size + name_len
+        offset += _pad(offset)
+        while offset + CHUNK_HEADER.size <= len(self._map):
+            magic, frames, stored, raw = CHUNK_HEADER.unpack_from(self._map, offset)
+            payload = offset + CHUNK_HEADER.size
+            if magic != CHUNK_MAGIC or payload + stored > len(self._map):
+                break
+            self._index.append((frames, payload, stored, raw))
+            offset = payload + stored + _pad(stored)
+
+    def __len__(self) -> int:
+        return sum(frames for frames, _, _, _ in self._index)
+
+    @property
+    def duration(self) -> float:
+        if not self._index:
+            return 0.0
+        first, last = self.chunk(0), self.chunk(len(self._index) - 1)
+        return float(last.times[-1] - first.times[0])
+
+    def chunk(self, k: int) -> RecordingChunk:
+        frames, payload, stored, raw = self._index[k]
+        if stored == raw:
+            return RecordingChunk(self._map, frames, payload)
+        return RecordingChunk(zlib.decompress(self._map[payload:payload + stored]), frames)
+
+    def chunks(self) -> Iterator[RecordingChunk]:
+        for k in range(len(self._index)):
+            yield self.chunk(k)
+
+    def frames(self) -> Iterator[Tuple[float, IngestedResults]]:
+        """(timestamp, results) for every recorded frame in order"""
+        for chunk in self.chunks():
+            times = chunk.times.tolist()
+            for i, t in enumerate(times):
+                yield t, chunk.results(i)
+
+    def close(self):
+        if self._map is None:
+            return
+        try:
+            self._map.close()
+        except BufferError:
+            pass    # chunk views still alive; the map is released with them
+        self._file.close()
+        self._map = None
+
+
+def replay(path: str, session=None, rebase: bool = True) -> dict:
+    """
+    Feeds a recording through a session's calibration, rep counting and feedback logic
+    (PoseProcessor / CalibrationManager / RepCounter) without running any model.
+    Unless a session is given, a headless one is created on a SimulatedClock that follows
+    the recorded timestamps, so calibration holds and rep timing never wait on wall time.
+    Returns the session's final report plus replay throughput.
+    """
+    from ai_engine import AIEngine
+    from workout_session import WorkoutSession
+
+    AIEngine.load_model()   # keep the one-off model load out of the replay and its timing
+    recording = LandmarkRecording(path)
+    if session is None:
+        session = WorkoutSession(recording.exercise_name or "Bicep Curl", adaptive_inference=False, headless=True,
+                                 clock=SimulatedClock(recording.origin))
+    if session.phase == WorkoutPhase.INACTIVE:
+        session.start(use_camera=False)
+
+    # Recorded times are shifted so the recorded session start lines up with this one
+    offset = session.calibration_manager.start_time - recording.origin if rebase else 0.0
+    clock = session.clock if isinstance(session.clock, SimulatedClock) else None
+    frames = 0
+    wall_start = time.perf_counter()
+    for t, results in recording.frames():
+        if clock is not None:
+            clock.set(t + offset)
+        session.process_landmarks(results, t + offset)
+        frames += 1
+    wall_time = time.perf_counter() - wall_start
+
+    report = session.get_final_report()
+    duration = recording.duration
+    report["replay"] = {
+        "file": path,
+        "frames": frames,
+        "recorded_duration": round(duration, 2),
+        "replay_time": round(wall_time, 3),
+        "realtime_factor": round(duration / wall_time, 1) if wall_time > 0 else None,
+    }
+    recording.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a landmark recording through the rep tracking logic")
+    parser.add_argument("recording", help="Path to a .plr landmark recording")
+    parser.add_argument("--exercise", default=None, help="Override the recorded exercise preset")
+    args = parser.parse_args()
+
+    session = None
+    if args.exercise:
+        from workout_session import WorkoutSession
+        session = WorkoutSession(args.exercise, adaptive_inference=False, headless=True)
+    print(json.dumps(replay(args.recording, session), indent=2))
+
+
+if __name__ == "__main__":
+    main()
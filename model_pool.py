@@ -0,0 +1,205 @@
+"""
+Warm pool of pre-initialized MediaPipe Holistic models leased to workout sessions
+"""
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from constants import (HOLISTIC_POOL_SIZE, HOLISTIC_POOL_MAX, HOLISTIC_LEASE_TIMEOUT,
+                       CAMERA_WIDTH, CAMERA_HEIGHT, INFERENCE_MODE)
+
+
+class ModelPoolExhausted(Exception):
+    """Raised when every model is leased and the pool is at its instance cap"""
+
+
+def create_holistic(min_detection_conf: float = 0.5, min_tracking_conf: float = 0.5):
+    """Builds a Holistic graph with the settings used by live sessions"""
+    import mediapipe as mp
+    return mp.solutions.holistic.Holistic(
+        min_detection_confidence=min_detection_conf,
+        min_tracking_confidence=min_tracking_conf,
+        model_complexity=0,
+        smooth_landmarks=True
+    )
+
+
+def create_pose_hands(min_detection_conf: float = 0.5, min_tracking_conf: float = 0.5):
+    """Builds the lightweight Pose + periodic wrist-ROI Hands model"""
+    from pose_hands_model import PoseHandsModel
+    return PoseHandsModel(min_detection_conf=min_detection_conf, min_tracking_conf=min_tracking_conf)
+
+
+MODEL_FACTORIES = {
+    "holistic": create_holistic,
+    "pose_hands": create_pose_hands,
+}
+
+
+def create_model(mode: str = INFERENCE_MODE, min_detection_conf: float = 0.5,
+                 min_tracking_conf: float = 0.5):
+    """Builds the inference model for the given INFERENCE_MODE"""
+    if mode not in MODEL_FACTORIES:
+        raise ValueError(f"Unknown inference mode '{mode}' (expected one of {list(MODEL_FACTORIES)})")
+    return MODEL_FACTORIES[mode](min_detection_conf, min_tracking_conf)
+
+
+def warm_up(model) -> None:
+    """Runs one inference on a blank frame so graph/model loading happens up front"""
+    blank = np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+    if hasattr(model, "warm_up"):
+        model.warm_up(blank)
+    else:
+        model.process(blank)
+
+
+def close_when_idle(model, in_use_by: Optional[threading.Thread] = None) -> None:
+    """Closes a model now, or once `in_use_by` exits so a graph is never closed mid-inference"""
+    def _close():
+        if in_use_by is not None:
+            in_use_by.join()
+        try:
+            model.close()
+        except Exception as e:
+            print(f"⚠️ Error closing model: {e}")
+
+    if in_use_by is None or not in_use_by.is_alive():
+        _close()
+    else:
+        threading.Thread(target=_close, name="model-close", daemon=True).start()
+
+
+class ModelPool:
+    """
+    Pre-creates `size` warmed-up models and leases them to sessions.
+    Grows on demand up to `max_size` instances; beyond that, acquire() waits for a return.
+    """
+
+    def __init__(self, size: int = HOLISTIC_POOL_SIZE, max_size: int = HOLISTIC_POOL_MAX,
+                 factory: Callable = create_holistic):
+        self.size = size
+        self.max_size = max(size, max_size)
+        self.factory = factory
+
+        self._idle: List = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _create(self):
+        model = self.factory()
+        warm_up(model)
+        return model
+
+    def prewarm(self) -> None:
+        """Creates models until `size` instances exist (call at server startup)"""
+        start = time.time()
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    break
+                self._total += 1
+            try:
+                model = self._create()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                raise
+            with self._cond:
+                self._idle.append(model)
+                self._cond.notify()
+        print(f"🔥 Model pool warm: {self._total} instance(s) in {time.time() - start:.2f}s")
+
+    def prewarm_async(self) -> threading.Thread:
+        """Prewarms on a daemon thread so the server can accept connections meanwhile"""
+        def _run():
+            try:
+                self.prewarm()
+            except Exception as e:
+                print(f"⚠️ Model pool warm-up failed: {e}")
+        thread = threading.Thread(target=_run, name="model-pool-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def acquire(self, timeout: Optional[float] = HOLISTIC_LEASE_TIMEOUT):
+        """Leases a warm model, creating one if under the cap, else waiting up to `timeout`"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ModelPoolExhausted("Model pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise ModelPoolExhausted(
+                        f"All {self.max_size} models are in use"
+                    )
+                self._cond.wait(remaining)
+
+        # Build outside the lock so other leases/returns are not blocked
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, model) -> None:
+        """Returns a leased model after clearing its tracking state from the previous session"""
+        try:
+            if hasattr(model, "reset"):
+                model.reset()
+            else:
+                # Older MediaPipe builds lack reset(); a fresh graph is the only clean state
+                model.close()
+                model = self._create()
+        except Exception as e:
+            print(f"⚠️ Discarding model that failed to reset: {e}")
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                model.close()
+                return
+            self._idle.append(model)
+            self._cond.notify()
+
+    def discard(self, model, in_use_by: Optional[threading.Thread] = None) -> None:
+        """
+        Takes a leased model out of the pool for good instead of returning it. When a thread may
+        still be inside model.process(), the model is closed only after that thread exits.
+        """
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+        close_when_idle(model, in_use_by)
+
+    def close(self) -> None:
+        """Closes idle models; leased ones are closed as they come back"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for model in idle:
+            model.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "leased": self._total - len(self._idle),
+                "total": self._total,
+                "max": self.max_size
+            }
@@ -0,0 +1,231 @@
+"""
+Versioned, hot-reloadable form-quality models keyed by exercise
+
+Layout of the model directory (FORM_MODEL_DIR):
+    <dir>/default/<version>.pkl        used for every exercise without its own model
+    <dir>/bicep_curl/<version>.pkl     per exercise: ExerciseConfig.name, lower case, "_" for spaces
+    <dir>/<key>/holdout.npz            optional validation set: X (n, 16) features, y (n,) labels
+A version may also ship only its compiled cache (<version>.forest.npz). The newest file
+(by modification time) in each directory is the candidate version.
+
+A background thread polls the directory, loads candidates (compiled via compiled_forest),
+validates them on the holdout set and swaps them in atomically; live sessions keep
+predicting with the previous version until the swap, and a rejected version is never served.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from compiled_forest import load_forest
+from constants import (FORM_FEATURE_COUNT, FORM_MODEL_DIR, FORM_MODEL_HOLDOUT, FORM_MODEL_MAX_REGRESSION,
+                       FORM_MODEL_MIN_ACCURACY, FORM_MODEL_POLL_INTERVAL)
+
+DEFAULT_KEY = "default"
+_COMPILED_SUFFIX = ".forest.npz"
+
+
+def exercise_key(exercise_name: Optional[str]) -> str:
+    """Directory name for an ExerciseConfig.name ("Bicep Curl" -> "bicep_curl")"""
+    if not exercise_name:
+        return DEFAULT_KEY
+    return "_".join(exercise_name.lower().split())
+
+
+@dataclass
+class ModelVersion:
+    """One loaded model version and how it scored on the holdout set"""
+    key: str
+    version: str
+    path: str
+    model: object = field(repr=False)
+    mtime: float = 0.0
+    accuracy: Optional[float] = None
+    holdout_size: int = 0
+    loaded_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "model": type(self.model).__name__,
+            "accuracy": None if self.accuracy is None else round(self.accuracy, 4),
+            "holdout_size": self.holdout_size,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class FormModelRegistry:
+    """Serves the current model version per exercise and rolls out new versions without restarts"""
+
+    def __init__(self, directory: str = FORM_MODEL_DIR, poll_interval: float = FORM_MODEL_POLL_INTERVAL,
+                 fallback=None):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.fallback = fallback     # model used when neither the exercise nor "default" has one
+
+        # Both maps are replaced wholesale (under _lock) on every change, so readers never need the lock
+        self._models: Dict[str, ModelVersion] = {}
+        self._rejected: Dict[str, Tuple[str, float, str]] = {}   # key -> (version, mtime, reason)
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()   # one scan at a time (poll thread vs. manual reload)
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --- SERVING ---
+    def model_for(self, exercise_name: Optional[str] = None):
+        """Current model for an exercise, falling back to the default version, then `fallback`"""
+        models = self._models
+        entry = models.get(exercise_key(exercise_name)) or models.get(DEFAULT_KEY)
+        return entry.model if entry is not None else self.fallback
+
+    def version_for(self, exercise_name: Optional[str] = None) -> Optional[str]:
+        models = self._models
+        entry = models.get(exercise_key(exercise_name)) or models.get(DEFAULT_KEY)
+        return entry.version if entry is not None else None
+
+    # --- DISCOVERY ---
+    def _candidates(self) -> Dict[str, Tuple[str, str, float]]:
+        """Newest model file per key: {key: (version, model path, mtime)}"""
+        found = {}
+        if not os.path.isdir(self.directory):
+            return found
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir():
+                continue
+            newest = None
+            for item in os.scandir(entry.path):
+                name = item.name
+                if name.endswith(_COMPILED_SUFFIX):
+                    version = name[:-len(_COMPILED_SUFFIX)]
+                elif name.endswith(".pkl"):
+                    version = name[:-len(".pkl")]
+                else:
+                    continue
+                mtime = item.stat().st_mtime
+                # The compiled cache written next to a .pkl is not a newer version of it
+                pkl = os.path.join(entry.path, version + ".pkl")
+                if name.endswith(_COMPILED_SUFFIX) and os.path.exists(pkl):
+                    continue
+                if newest is None or (mtime, version) > (newest[2], newest[0]):
+                    newest = (version, pkl, mtime)
+            if newest is not None:
+                found[entry.name] = newest
+        return found
+
+    def _load_holdout(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        path = os.path.join(self.directory, key, FORM_MODEL_HOLDOUT)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return np.asarray(data["X"], dtype=np.float64), np.asarray(data["y"])
+
+    # --- VALIDATION & SWAP ---
+    def _validate(self, key: str, model) -> Tuple[Optional[float], int, Optional[str]]:
+        """(holdout accuracy, holdout size, rejection reason or None)"""
+        n_features = getattr(model, "n_features_in_", FORM_FEATURE_COUNT)
+        if n_features != FORM_FEATURE_COUNT:
+            return None, 0, f"expects {n_features} features, sessions send {FORM_FEATURE_COUNT}"
+
+        holdout = self._load_holdout(key)
+        if holdout is None:
+            # Nothing to score against: only check that it predicts known labels
+            probe = np.zeros((2, FORM_FEATURE_COUNT))
+            if not set(np.asarray(model.predict(probe)).tolist()) <= {0, 1}:
+                return None, 0, "predicts labels other than 0/1"
+            print(f"⚠️ No {FORM_MODEL_HOLDOUT} for '{key}'; model accepted unscored")
+            return None, 0, None
+
+        X, y = holdout
+        accuracy = float(np.mean(np.asarray(model.predict(X)) == y))
+        if accuracy < FORM_MODEL_MIN_ACCURACY:
+            return accuracy, len(y), f"holdout accuracy {accuracy:.3f} < {FORM_MODEL_MIN_ACCURACY}"
+
+        current = self._models.get(key)
+        if current is not None:
+            baseline = float(np.mean(np.asarray(current.model.predict(X)) == y))
+            if accuracy < baseline - FORM_MODEL_MAX_REGRESSION:
+                return accuracy, len(y), f"holdout accuracy {accuracy:.3f} below serving {current.version} ({baseline:.3f})"
+        return accuracy, len(y), None
+
+    def refresh(self) -> Dict[str, str]:
+        """
+        Scans once, loading and validating every new version; returns {key: outcome}.
+        Runs on the poll thread, but may also be called directly (e.g. at startup).
+        """
+        with self._scan_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[str, str]:
+        outcomes = {}
+        for key, (version, path, mtime) in self._candidates().items():
+            current = self._models.get(key)
+            if current is not None and (current.version, current.mtime) == (version, mtime):
+                continue
+            rejected = self._rejected.get(key)
+            if rejected is not None and rejected[:2] == (version, mtime):
+                continue
+
+            try:
+                model = load_forest(path)
+                if model is None:
+                    raise FileNotFoundError(path)
+            except Exception as e:
+                # Possibly transient (a file still being written): retried on the next scan
+                outcomes[key] = f"load of {version} failed: {e}"
+                print(f"⚠️ Form model {key}/{version} failed to load: {e}")
+                continue
+            try:
+                accuracy, size, reason = self._validate(key, model)
+            except Exception as e:
+                accuracy, size, reason = None, 0, f"validation failed: {e}"
+
+            if reason is not None:
+                with self._lock:
+                    self._rejected = {**self._rejected, key: (version, mtime, reason)}
+                outcomes[key] = f"rejected {version}: {reason}"
+                print(f"❌ Form model {key}/{version} rejected: {reason}")
+                continue
+
+            entry = ModelVersion(key, version, path, model, mtime, accuracy, size)
+            with self._lock:
+                self._models = {**self._models, key: entry}
+                self._rejected = {k: v for k, v in self._rejected.items() if k != key}
+            outcomes[key] = f"serving {version}"
+            score = "" if accuracy is None else f" (holdout accuracy {accuracy:.3f})"
+            print(f"✅ Form model {key}/{version} now serving{score}")
+        return outcomes
+
+    # --- BACKGROUND POLLING ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="form-model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Form model scan failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def status(self) -> dict:
+        models, rejected = self._models, self._rejected
+        return {
+            "directory": self.directory,
+            "watching": self._thread is not None,
+            "serving": {key: entry.to_dict() for key, entry in models.items()},
+            "rejected": {key: {"version": v, "reason": reason} for key, (v, _, reason) in rejected.items()},
+            "fallback": None if self.fallback is None else type(self.fallback).__name__,
+        }
@@ -2,9 +2,13 @@
 Data classes for state management - UPDATED FOR USER-CENTERED DESIGN & ACCURACY
 """
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, List, Optional
 import time
 
+import numpy as np
+
+from history_store import HistoryColumn
+
 # --- NEW MODELS FOR GHOST POSE ---
 @dataclass
 class Landmark2D:
@@ -18,12 +22,25 @@ class GhostPose:
     Represents the target pose skeleton and instructions for the ghost model overlay.
     Coordinates are normalized (0.0 to 1.0).
     """
-    # Key is MediaPipe index (converted to string on output), value is normalized [x, y]
-    landmarks: Dict[int, Landmark2D] = field(default_factory=dict)
+    # (33, 2) normalized [x, y] per MediaPipe index; None until the first workout frame
+    points: Optional[np.ndarray] = None
     color: str = "GRAY" # Will be "GREEN", "RED", "YELLOW", or "GRAY"
     instruction: str = "Calibrating..."
     connections: List[tuple] = field(default_factory=list)
 
+    @property
+    def landmarks(self) -> Dict[int, Landmark2D]:
+        """Per-index view of `points` for callers that want objects"""
+        if self.points is None:
+            return {}
+        return {idx: Landmark2D(x=x, y=y) for idx, (x, y) in enumerate(self.points.tolist())}
+
+    def landmarks_dict(self) -> Dict[str, List[float]]:
+        """Serialized form sent to the frontend: {"<index>": [x, y]}"""
+        if self.points is None:
+            return {}
+        return {str(idx): xy for idx, xy in enumerate(self.points.tolist())}
+
 
 @dataclass
 class ArmMetrics:
@@ -78,12 +95,17 @@ class CalibrationData:
 
 @dataclass
 class SessionHistory:
-    """Tracks session data for analysis"""
-    time: List[float] = field(default_factory=list)
-    right_angle: List[int] = field(default_factory=list)
-    left_angle: List[int] = field(default_factory=list)
+    """Tracks session data for analysis in bounded-memory columns (see history_store)"""
+    time: HistoryColumn = field(default_factory=lambda: HistoryColumn(np.float64))
+    right_angle: HistoryColumn = field(default_factory=lambda: HistoryColumn(np.int16))
+    left_angle: HistoryColumn = field(default_factory=lambda: HistoryColumn(np.int16))
     right_feedback_count: int = 0
     left_feedback_count: int = 0
+
+    def append(self, elapsed: float, right_angle: int, left_angle: int):
+        self.time.append(elapsed)
+        self.right_angle.append(right_angle)
+        self.left_angle.append(left_angle)
     
     def reset(self):
         self.time.clear()
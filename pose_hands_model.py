@@ -0,0 +1,126 @@
+"""
+Lightweight inference: Pose on every frame, Hands only on wrist crops every Nth frame
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+from constants import HAND_INFERENCE_INTERVAL, HAND_ROI_SCALE, HAND_ROI_MIN_SIZE
+from landmark_ingest import IngestedLandmark, IngestedLandmarkList, IngestedResults
+
+# MediaPipe Pose indices (elbow -> wrist gives the forearm direction for the hand crop)
+RIGHT_ELBOW, RIGHT_WRIST = 14, 16
+LEFT_ELBOW, LEFT_WRIST = 13, 15
+
+
+class PoseHandsModel:
+    """
+    Drop-in replacement for mp.solutions.holistic.Holistic when only the body pose is
+    needed every frame. Hand landmarks (used for V-sign detection) come from a Hands
+    model run on a small crop around each wrist, every `hand_interval` frames; in
+    between, the last hand result is reused. Face landmarks are never computed.
+    """
+
+    def __init__(self, hand_interval: int = HAND_INFERENCE_INTERVAL,
+                 min_detection_conf: float = 0.5, min_tracking_conf: float = 0.5):
+        self.hand_interval = hand_interval
+        self.min_detection_conf = min_detection_conf
+        self.min_tracking_conf = min_tracking_conf
+
+        self.pose = None
+        self.hands = None
+        self._build()
+
+        self._frame_idx = 0
+        self._last_hands = (None, None)
+
+    def _build(self):
+        import mediapipe as mp
+        self.pose = mp.solutions.pose.Pose(
+            min_detection_confidence=self.min_detection_conf,
+            min_tracking_confidence=self.min_tracking_conf,
+            model_complexity=0,
+            smooth_landmarks=True
+        )
+        # Crops jump around between runs, so each one is treated as a still image
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=True,
+            max_num_hands=1,
+            model_complexity=0,
+            min_detection_confidence=self.min_detection_conf
+        ) if self.hand_interval > 0 else None
+
+    def process(self, image: np.ndarray) -> IngestedResults:
+        """Same contract as Holistic.process: RGB image in, results with pose/hand landmarks out"""
+        pose_results = self.pose.process(image)
+        pose_landmarks = pose_results.pose_landmarks
+
+        if self.hands is None or not pose_landmarks:
+            self._last_hands = (None, None)
+        elif self._frame_idx % self.hand_interval == 0:
+            lm = pose_landmarks.landmark
+            self._last_hands = (
+                self._detect_hand(image, lm[RIGHT_ELBOW], lm[RIGHT_WRIST]),
+                self._detect_hand(image, lm[LEFT_ELBOW], lm[LEFT_WRIST]),
+            )
+        self._frame_idx += 1
+
+        right_hand, left_hand = self._last_hands
+        return IngestedResults(pose_landmarks, right_hand, left_hand)
+
+    def _detect_hand(self, image: np.ndarray, elbow, wrist) -> Optional[IngestedLandmarkList]:
+        """Runs Hands on a square ROI just beyond the wrist and maps landmarks back to the full frame"""
+        if wrist.visibility < 0.5:
+            return None
+
+        h, w = image.shape[:2]
+        ex, ey = elbow.x * w, elbow.y * h
+        wx, wy = wrist.x * w, wrist.y * h
+        forearm = math.hypot(wx - ex, wy - ey)
+
+        # The hand extends past the wrist along the forearm direction
+        cx = wx + (wx - ex) * 0.5
+        cy = wy + (wy - ey) * 0.5
+        half = max(forearm * HAND_ROI_SCALE, HAND_ROI_MIN_SIZE) / 2
+
+        x0, y0 = max(0, int(cx - half)), max(0, int(cy - half))
+        x1, y1 = min(w, int(cx + half)), min(h, int(cy + half))
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+
+        crop = np.ascontiguousarray(image[y0:y1, x0:x1])
+        hand_results = self.hands.process(crop)
+        if not hand_results.multi_hand_landmarks:
+            return None
+
+        cw, ch = x1 - x0, y1 - y0
+        return IngestedLandmarkList([
+            IngestedLandmark((x0 + p.x * cw) / w, (y0 + p.y * ch) / h, p.z)
+            for p in hand_results.multi_hand_landmarks[0].landmark
+        ])
+
+    def warm_up(self, image: np.ndarray) -> None:
+        """Loads both graphs (the hand graph would otherwise load on the first visible wrist)"""
+        self.pose.process(image)
+        if self.hands is not None:
+            self.hands.process(image[:HAND_ROI_MIN_SIZE * 2, :HAND_ROI_MIN_SIZE * 2].copy())
+
+    def reset(self) -> None:
+        """Clears tracking state between sessions"""
+        for model in (self.pose, self.hands):
+            if model is None:
+                continue
+            if not hasattr(model, "reset"):
+                self.close()
+                self._build()
+                break
+            model.reset()
+        self._frame_idx = 0
+        self._last_hands = (None, None)
+
+    def close(self) -> None:
+        if self.pose is not None:
+            self.pose.close()
+        if self.hands is not None:
+            self.hands.close()
@@ -1,10 +1,27 @@
 """
 MediaPipe pose detection and landmark extraction - AGNOSTIC
 """
-import mediapipe as mp
 import math
 from typing import Dict, Optional
-from constants import ExerciseConfig 
+
+import numpy as np
+
+from constants import ExerciseConfig, POSE_LANDMARK_COUNT
+
+
+def landmarks_to_array(landmark_list, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Packs a MediaPipe-style landmark list into an (N, 4) float32 array of x, y, z, visibility"""
+    array = getattr(landmark_list, 'array', None)
+    if array is None:
+        landmarks = landmark_list.landmark
+        array = np.fromiter((v for lm in landmarks for v in (lm.x, lm.y, lm.z, lm.visibility)),
+                            dtype=np.float32, count=4 * len(landmarks)).reshape(-1, 4)
+    elif out is None:
+        return array.copy()
+    if out is None:
+        return array
+    out[...] = array
+    return out
 
 
 class PoseProcessor:
@@ -13,49 +30,56 @@ class PoseProcessor:
     def __init__(self, angle_calculator, exercise_config: ExerciseConfig):
         self.angle_calculator = angle_calculator
         self.config = exercise_config 
+        # One preallocated buffer reused for every frame, plus the results object it holds
+        self._landmark_buffer = np.zeros((POSE_LANDMARK_COUNT, 4), dtype=np.float32)
+        self._buffer_results = None
+        self._joint_indices = np.array([exercise_config.right_landmarks, exercise_config.left_landmarks])
     
-    def extract_arm_angle(self, landmarks, arm: str) -> Optional[float]:
-        """Extract angle for the specified joint using the current exercise config"""
-        try:
-            # Select the correct landmark index list based on arm/side
-            if arm == 'RIGHT':
-                indices = self.config.right_landmarks
-            elif arm == 'LEFT':
-                indices = self.config.left_landmarks
-            else:
-                return None
-            
-            # Indices are (A, B, C) where B is the vertex
-            A_idx, B_idx, C_idx = indices
-            
-            # Extract Coordinates
-            A = [landmarks[A_idx].x, landmarks[A_idx].y] 
-            B = [landmarks[B_idx].x, landmarks[B_idx].y] 
-            C = [landmarks[C_idx].x, landmarks[C_idx].y] 
-            
-            # Check landmark visibility
-            if (landmarks[A_idx].visibility < 0.6 or
-                landmarks[B_idx].visibility < 0.6 or
-                landmarks[C_idx].visibility < 0.6):
-                return None
-
-            # Calculate and smooth the angle
-            raw_angle = self.angle_calculator.calculate_angle(A, B, C)
-            return self.angle_calculator.get_smoothed_angle(arm, raw_angle)
-            
-        except (KeyError, IndexError, AttributeError):
+    def extract_arm_angle(self, points: np.ndarray, arm: str, timestamp: Optional[float] = None) -> Optional[float]:
+        """Extract angle for the specified joint from a (33, 4) landmark array"""
+        if arm not in ('RIGHT', 'LEFT'):
             return None
-    
-    def get_both_arm_angles(self, results) -> Dict[str, Optional[int]]:
-        """Get angles for both sides defined in the config"""
-        if not results.pose_landmarks:
+        joints = points[self._joint_indices[0 if arm == 'RIGHT' else 1]]   # (3, 4), B is the vertex
+        if (joints[:, 3] < 0.6).any():
+            return None
+        raw_angle = float(self.angle_calculator.calculate_angles(joints[np.newaxis, :, :2].astype(np.float64))[0])
+        return self.angle_calculator.get_smoothed_angle(arm, raw_angle, timestamp)
+
+    def get_both_arm_angles(self, results, timestamp: Optional[float] = None) -> Dict[str, Optional[int]]:
+        """Get angles for both sides defined in the config; `timestamp` is the frame time in seconds"""
+        points = self.landmarks_to_array(results)
+        if points is None:
             return {'RIGHT': None, 'LEFT': None}
-        
-        landmarks = results.pose_landmarks.landmark
-        return {
-            'RIGHT': self.extract_arm_angle(landmarks, 'RIGHT'),
-            'LEFT': self.extract_arm_angle(landmarks, 'LEFT')
-        }
+        return self._angles_from_array(points, timestamp)
+
+    def landmarks_to_array(self, results) -> Optional[np.ndarray]:
+        """
+        Converts the pose landmarks of `results` into the shared (33, 4) float32 buffer
+        (x, y, z, visibility). The conversion happens once per results object; every later
+        call for the same frame returns the cached buffer. Consumers must copy it to keep it.
+        """
+        if not results.pose_landmarks:
+            return None
+        if results is self._buffer_results:
+            return self._landmark_buffer
+        try:
+            landmarks_to_array(results.pose_landmarks, out=self._landmark_buffer)
+        except (ValueError, AttributeError):
+            return None
+        self._buffer_results = results
+        return self._landmark_buffer
+
+    def _angles_from_array(self, points: np.ndarray, timestamp: Optional[float] = None) -> Dict[str, Optional[int]]:
+        """Both sides in one vectorized call; sides with a joint below 0.6 visibility are None"""
+        joints = points[self._joint_indices]                      # (2, 3, 4)
+        visible = (joints[:, :, 3] >= 0.6).all(axis=1)
+        # Upcast so angles match the scalar float64 math bit for bit
+        raw_angles = self.angle_calculator.calculate_angles(joints[:, :, :2].astype(np.float64)).tolist()
+
+        angles = {}
+        for i, arm in enumerate(('RIGHT', 'LEFT')):
+            angles[arm] = self.angle_calculator.get_smoothed_angle(arm, raw_angles[i], timestamp) if visible[i] else None
+        return angles
 
     def detect_v_sign(self, results) -> bool:
         """
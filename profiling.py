@@ -0,0 +1,154 @@
+"""
+Per-stage frame profiling: latency histograms per session, Prometheus text and JSON views
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from constants import PROFILING_ENABLED, PROFILE_BUCKETS, PROFILE_WINDOW
+
+# Frame stages in pipeline order (sessions may record a subset)
+STAGES = ("read", "flip", "color_convert", "inference", "gesture", "calibration", "rep_counting",
+          "ai_form", "ghost_ik", "overlay", "state", "emit", "encode", "end_to_end")
+
+perf = time.perf_counter
+
+
+class LatencyHistogram:
+    """
+    Cumulative bucket counts (what Prometheus scrapes) plus a ring buffer of the last
+    `window` samples for rolling percentiles. Values are seconds.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = PROFILE_BUCKETS, window: int = PROFILE_WINDOW):
+        self.bounds = np.asarray(buckets, dtype=np.float64)
+        self.counts = np.zeros(len(buckets) + 1, dtype=np.int64)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._recent = np.zeros(max(1, window), dtype=np.float64)
+        self._head = 0
+
+    def observe(self, seconds: float):
+        self.counts[int(np.searchsorted(self.bounds, seconds, side="left"))] += 1
+        self.total += seconds
+        self.count += 1
+        self._recent[self._head % len(self._recent)] = seconds
+        self._head += 1
+
+    def recent(self) -> np.ndarray:
+        return self._recent[:min(self._head, len(self._recent))]
+
+    def summary(self) -> dict:
+        """Rolling-window percentiles in milliseconds plus lifetime totals"""
+        recent = self.recent()
+        if not len(recent):
+            return {"count": self.count}
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99)) * 1000
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(recent.max()) * 1000, 3),
+        }
+
+
+class StageProfiler:
+    """Records stage durations for one session; every sample is also fed to `parent` (node totals)"""
+
+    enabled = True
+
+    def __init__(self, parent: Optional["StageProfiler"] = None):
+        self.parent = parent
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+        if self.parent is not None:
+            self.parent.record(stage, seconds)
+
+    def since(self, stage: str, start: float) -> float:
+        """Records the time elapsed since a `perf()` reading and returns a fresh reading"""
+        now = perf()
+        self.record(stage, now - start)
+        return now
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = perf()
+        try:
+            yield
+        finally:
+            self.record(stage, perf() - start)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {stage: h.summary() for stage, h in self._ordered()}
+
+    def _ordered(self) -> Iterable[Tuple[str, LatencyHistogram]]:
+        known = [(s, self.histograms[s]) for s in STAGES if s in self.histograms]
+        extra = [(s, h) for s, h in self.histograms.items() if s not in STAGES]
+        return known + extra
+
+
+class NullProfiler(StageProfiler):
+    """Drop-in used when profiling is disabled: every call is a no-op"""
+
+    enabled = False
+
+    def __init__(self, parent=None):
+        super().__init__(None)
+
+    def record(self, stage: str, seconds: float):
+        pass
+
+    def since(self, stage: str, start: float) -> float:
+        return start
+
+
+# Aggregate over every session on this node; survives session churn for capacity planning
+NODE_PROFILER = StageProfiler() if PROFILING_ENABLED else NullProfiler()
+
+
+def create_profiler(enabled: Optional[bool] = None) -> StageProfiler:
+    if enabled is None:
+        enabled = PROFILING_ENABLED
+    return StageProfiler(parent=NODE_PROFILER) if enabled else NullProfiler()
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for k, v in labels.items())
+
+
+def prometheus_text(gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Prometheus text exposition: one `rehab_stage_seconds` histogram per stage for the node-wide
+    aggregate (session="node"), plus optional gauges. Live sessions are deliberately not
+    exported: their ids would add label series on every session and identify patients.
+    """
+    lines = [
+        "# HELP rehab_stage_seconds Time spent per frame processing stage",
+        "# TYPE rehab_stage_seconds histogram",
+    ]
+    with NODE_PROFILER._lock:
+        for stage, h in NODE_PROFILER._ordered():
+            cumulative = np.cumsum(h.counts)
+            for bound, count in zip(h.bounds.tolist() + ["+Inf"], cumulative.tolist()):
+                lines.append(f"rehab_stage_seconds_bucket{{{_labels(session='node', stage=stage, le=bound)}}} {count}")
+            lines.append(f"rehab_stage_seconds_sum{{{_labels(session='node', stage=stage)}}} {h.total:.9f}")
+            lines.append(f"rehab_stage_seconds_count{{{_labels(session='node', stage=stage)}}} {h.count}")
+
+    for name, value in (gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -2,15 +2,27 @@
 Rep counting logic - STABILIZED AND ACCURACY-FOCUSED
 """
 from collections import deque
+from clock import SYSTEM_CLOCK
 from constants import ArmStage
-import time
 import random
 
 class RepCounter:
-    def __init__(self, calibration_data, min_rep_duration=0.5):
+    # Stage thresholds (degrees) and confirmation window, shared with batch_rep_counter
+    STATE_BUFFER = 15       # UP/DOWN zones extend this far inside the calibrated range
+    HYSTERESIS = 5          # extra margin before leaving UP/DOWN
+    STATE_HOLD_TIME = 0.1   # seconds a new stage must persist
+
+    def __init__(self, calibration_data, min_rep_duration=0.5, predictive=False, clock=None):
+        from constants import REP_PREDICTION_HORIZON, REP_PREDICTIVE_HOLD_TIME
         self.calibration = calibration_data
+        self.clock = clock or SYSTEM_CLOCK
         self.min_rep_duration = min_rep_duration 
 
+        # Predictive mode: classify the angle the joint will reach `prediction_horizon` seconds
+        # ahead (from the smoother's velocity) and confirm it over a shorter hold window
+        self.predictive = predictive
+        self.prediction_horizon = REP_PREDICTION_HORIZON
+
         # Stability buffers for EACH arm independently
         self.angle_history = {
             'RIGHT': deque(maxlen=8),
@@ -22,7 +34,7 @@ class RepCounter:
         self.color_hold_duration = 1.5 # Seconds to hold a color (e.g. Green) stable
 
         # State confirmation variables - INDEPENDENT
-        self.state_hold_time = 0.1 
+        self.state_hold_time = REP_PREDICTIVE_HOLD_TIME if predictive else self.STATE_HOLD_TIME
         self.pending_state = {'RIGHT': None, 'LEFT': None}
         self.pending_state_start = {'RIGHT': 0, 'LEFT': 0}
         
@@ -58,8 +70,14 @@ class RepCounter:
         accuracy = (user_range / cal_range) * 100
         return min(100, int(accuracy))
 
-    def process_rep(self, arm, angle, metrics, current_time, history):
-        """Process rep counting for a single arm independently"""
+    def process_rep(self, arm, angle, metrics, current_time, history, velocity=None):
+        """
+        Process rep counting for a single arm independently.
+        `velocity` (degrees/second) is only used in predictive mode.
+        A `current_time` of None reads the counter's clock.
+        """
+        if current_time is None:
+            current_time = self.clock.now()
         metrics.angle = angle
         self.angle_history[arm].append(angle)
 
@@ -77,7 +95,7 @@ class RepCounter:
         extended = self.calibration.extended_threshold
         
         # --- 1. DETERMINE STATE ---
-        target_state = self._determine_target_state(angle, contracted, extended, prev_stage)
+        target_state = self._determine_target_state(angle, contracted, extended, prev_stage, velocity)
         
         # --- 2. STATE SWITCHING WITH CONFIRMATION ---
         if target_state != prev_stage:
@@ -97,11 +115,14 @@ class RepCounter:
         # --- 3. STABILIZED FEEDBACK GENERATION ---
         self._provide_user_centered_feedback(arm, angle, metrics, current_time)
 
-    def _determine_target_state(self, angle, contracted, extended, current_stage):
+    def _determine_target_state(self, angle, contracted, extended, current_stage, velocity=None):
         """Determines state with buffer for easier rep counting"""
-        buffer = 15 
-        up_limit = contracted + buffer 
-        down_limit = extended - buffer
+        if self.predictive and velocity is not None:
+            # Fire on the predicted crossing instead of waiting for the filtered angle to get there
+            angle = angle + velocity * self.prediction_horizon
+
+        up_limit = contracted + self.STATE_BUFFER
+        down_limit = extended - self.STATE_BUFFER
 
         if angle <= up_limit:
             return ArmStage.UP.value
@@ -110,9 +131,9 @@ class RepCounter:
         
         # Hysteresis Transitions (prevents flickering)
         if current_stage == ArmStage.UP.value:
-            return ArmStage.UP.value if angle < (up_limit + 5) else ArmStage.MOVING_DOWN.value
+            return ArmStage.UP.value if angle < (up_limit + self.HYSTERESIS) else ArmStage.MOVING_DOWN.value
         elif current_stage == ArmStage.DOWN.value:
-            return ArmStage.DOWN.value if angle > (down_limit - 5) else ArmStage.MOVING_UP.value
+            return ArmStage.DOWN.value if angle > (down_limit - self.HYSTERESIS) else ArmStage.MOVING_UP.value
         elif current_stage == ArmStage.MOVING_UP.value:
             return ArmStage.UP.value if angle <= up_limit else ArmStage.MOVING_UP.value
         elif current_stage == ArmStage.MOVING_DOWN.value:
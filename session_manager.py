@@ -0,0 +1,235 @@
+"""
+Multi-tenant registry of live workout sessions
+"""
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from constants import MAX_CONCURRENT_SESSIONS, SESSION_IDLE_TIMEOUT, SESSION_REAPER_INTERVAL
+
+
+class SessionLimitError(Exception):
+    """Raised when a node is already serving its maximum number of sessions"""
+
+
+@dataclass
+class ManagedSession:
+    """A WorkoutSession plus the resources and bookkeeping the registry owns for it"""
+    session_id: str
+    session: object
+    email: Optional[str] = None
+    pipeline: Optional[object] = None
+    stream: Optional[object] = None
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.time)
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def close(self) -> dict:
+        """Stops the pipeline and session, returning the final report"""
+        straggler = None
+        if self.pipeline is not None:
+            # Not under self.lock: the inference stage needs it to finish its current frame
+            if not self.pipeline.stop():
+                # Inference is still inside the model: it must not go back to the pool yet
+                straggler = self.pipeline.inference_thread
+                print(f"⚠️ Inference for session {self.session_id} did not stop in time; discarding its model")
+            self.pipeline = None
+        # A straggler is stuck holding the lock inside the model; waiting for it would hang shutdown
+        with self.lock if straggler is None else nullcontext():
+            report = self.session.get_final_report()
+            self.session.stop(model_in_use_by=straggler)
+            return report
+
+
+class SessionManager:
+    """Owns many WorkoutSession instances keyed by session id (and user email)"""
+
+    def __init__(self, max_sessions: int = MAX_CONCURRENT_SESSIONS,
+                 idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+
+        self._sessions: Dict[str, ManagedSession] = {}
+        self._email_index: Dict[str, str] = {}
+        self._last_reports: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+
+    # --- REGISTRATION ---
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    def register(self, session, session_id: Optional[str] = None, email: Optional[str] = None,
+                 pipeline=None, stream=None) -> ManagedSession:
+        """
+        Adds a started session; an existing session with the same id or email is replaced.
+        A pipeline's lock becomes the entry's lock, so routes and inference share one mutex,
+        and frames or state the pipeline delivers count as activity for idle eviction.
+        """
+        session_id = session_id or self.new_session_id()
+        entry = ManagedSession(session_id=session_id, session=session, email=email,
+                               pipeline=pipeline, stream=stream)
+        if pipeline is not None:
+            entry.lock = pipeline.lock
+            pipeline.on_activity = entry.touch
+
+        with self._lock:
+            replaced = [self._sessions.pop(session_id, None)]
+            if email and self._email_index.get(email) not in (None, session_id):
+                replaced.append(self._sessions.pop(self._email_index[email], None))
+            replaced = [r for r in replaced if r is not None]
+            for old in replaced:
+                self._unindex(old)
+
+            if len(self._sessions) >= self.max_sessions:
+                # Put replaced sessions back untouched; the caller decides what to do
+                for old in replaced:
+                    self._index(old)
+                raise SessionLimitError(
+                    f"Maximum of {self.max_sessions} concurrent sessions reached"
+                )
+
+            self._index(entry)
+            self._last_reports.pop(session_id, None)
+
+        for old in replaced:
+            self._close_entry(old)
+        return entry
+
+    def reserve_slot(self, session_id: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Raises SessionLimitError early, before expensive camera/model setup"""
+        with self._lock:
+            if session_id in self._sessions or (email and email in self._email_index):
+                return
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionLimitError(
+                    f"Maximum of {self.max_sessions} concurrent sessions reached"
+                )
+
+    def _index(self, entry: ManagedSession):
+        self._sessions[entry.session_id] = entry
+        if entry.email:
+            self._email_index[entry.email] = entry.session_id
+
+    def _unindex(self, entry: ManagedSession):
+        if entry.email and self._email_index.get(entry.email) == entry.session_id:
+            del self._email_index[entry.email]
+
+    # --- LOOKUP ---
+    def get(self, session_id: Optional[str] = None, email: Optional[str] = None) -> Optional[ManagedSession]:
+        """Finds a live session by id, falling back to the user's email"""
+        with self._lock:
+            entry = self._sessions.get(session_id) if session_id else None
+            if entry is None and email:
+                entry = self._sessions.get(self._email_index.get(email))
+        if entry is not None:
+            entry.touch()
+        return entry
+
+    def resolve_id(self, session_id: Optional[str] = None, email: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the id a request refers to, or None when a new one should be issued.
+        Emails are only index keys: they never become session ids (ids are returned to
+        clients and listed publicly).
+        """
+        if session_id:
+            return session_id
+        if email:
+            with self._lock:
+                return self._email_index.get(email)
+        return None
+
+    def list_sessions(self) -> List[dict]:
+        with self._lock:
+            entries = list(self._sessions.values())
+        return [{
+            "session_id": e.session_id,
+            "exercise": e.session.exercise_config.name,
+            "status": e.session.phase.value,
+            "viewers": e.pipeline.broadcaster.viewer_count if e.pipeline else 0,
+            "idle_seconds": round(time.time() - e.last_active, 1)
+        } for e in entries]
+
+    def profilers(self) -> dict:
+        """session_id -> StageProfiler for every live session"""
+        with self._lock:
+            return {sid: e.session.profiler for sid, e in self._sessions.items()}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    # --- SHUTDOWN ---
+    def stop(self, session_id: Optional[str] = None, email: Optional[str] = None) -> Optional[dict]:
+        """Stops and removes a session, returning its final report"""
+        with self._lock:
+            if not session_id and email:
+                session_id = self._email_index.get(email)
+            entry = self._sessions.pop(session_id, None) if session_id else None
+            if entry is not None:
+                self._unindex(entry)
+        if entry is None:
+            return None
+        return self._close_entry(entry)
+
+    def _close_entry(self, entry: ManagedSession) -> Optional[dict]:
+        try:
+            report = entry.close()
+        except Exception as e:
+            print(f"⚠️ Error stopping session {entry.session_id}: {e}")
+            return None
+        with self._lock:
+            self._last_reports[entry.session_id] = report
+            if entry.email:
+                self._last_reports[entry.email] = report
+        return report
+
+    def last_report(self, session_id: Optional[str] = None, email: Optional[str] = None) -> Optional[dict]:
+        """Report of the most recently stopped session for this id / user"""
+        with self._lock:
+            return self._last_reports.get(session_id) or self._last_reports.get(email)
+
+    def stop_all(self):
+        with self._lock:
+            ids = list(self._sessions.keys())
+        for session_id in ids:
+            self.stop(session_id)
+
+    # --- IDLE EVICTION ---
+    def evict_idle(self) -> List[str]:
+        """Stops sessions that have not been touched within idle_timeout"""
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            stale = [sid for sid, e in self._sessions.items() if e.last_active < cutoff]
+        for session_id in stale:
+            print(f"💤 Evicting idle session {session_id}")
+            self.stop(session_id)
+        return stale
+
+    def start_reaper(self, interval: float = SESSION_REAPER_INTERVAL):
+        """Runs idle eviction periodically on a daemon thread"""
+        if self._reaper is not None:
+            return
+
+        def _loop():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    print(f"⚠️ Session reaper error: {e}")
+
+        self._reaper = threading.Thread(target=_loop, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        self._reaper_stop.set()
+        self._reaper = None
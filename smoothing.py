@@ -0,0 +1,220 @@
+"""
+Streaming angle smoothers: allocation-free per-frame filters with a known latency.
+Every smoother also exposes `velocity` (degrees/second) for predictive rep counting, measured
+over the real time between updates when `update` is given frame timestamps.
+"""
+import math
+from bisect import bisect_left, insort
+from typing import Dict, Optional, Type
+
+from constants import (SMOOTHING_WINDOW, SMOOTHING_EMA_ALPHA, SMOOTHING_FRAME_RATE,
+                       ONE_EURO_MIN_CUTOFF, ONE_EURO_BETA, ONE_EURO_D_CUTOFF,
+                       KALMAN_PROCESS_NOISE, KALMAN_MEASUREMENT_NOISE)
+
+
+def _step_seconds(last_time: Optional[float], timestamp: Optional[float], frame_rate: float) -> float:
+    """Seconds since the previous update; one nominal frame without (increasing) timestamps"""
+    if timestamp is None or last_time is None or timestamp <= last_time:
+        return 1.0 / frame_rate
+    return timestamp - last_time
+
+
+class StreamingMedian:
+    """
+    Running median over the last `window` samples.
+    A fixed ring buffer remembers arrival order and a sorted list of the same samples gives
+    the median by index; each update is one bisect removal and one bisect insertion.
+    """
+
+    def __init__(self, window: int = SMOOTHING_WINDOW):
+        self.window = max(1, window)
+        self._ring = [0.0] * self.window
+        self._sorted = []
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def update(self, value: float) -> float:
+        if len(self._sorted) == self.window:
+            del self._sorted[bisect_left(self._sorted, self._ring[self._head])]
+        self._ring[self._head] = value
+        self._head = (self._head + 1) % self.window
+        insort(self._sorted, value)
+        return self.median()
+
+    def median(self) -> float:
+        n = len(self._sorted)
+        mid = n // 2
+        if n % 2:
+            return self._sorted[mid]
+        # Same mean-of-middle-pair convention as np.median
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+    def reset(self):
+        self._sorted.clear()
+        self._head = 0
+
+    @property
+    def latency_frames(self) -> float:
+        """Delay on a steady ramp: the median of a full window sits at its centre"""
+        return (self.window - 1) / 2
+
+
+class MedianEmaSmoother:
+    """Streaming median followed by an EMA (the original AngleCalculator behaviour)"""
+
+    def __init__(self, window: int = SMOOTHING_WINDOW, alpha: float = SMOOTHING_EMA_ALPHA,
+                 frame_rate: float = SMOOTHING_FRAME_RATE):
+        self.median = StreamingMedian(window)
+        self.alpha = alpha
+        self.frame_rate = frame_rate
+        self.value = None
+        self.velocity = 0.0
+        self._last_time = None
+
+    def update(self, angle: float, timestamp: Optional[float] = None) -> float:
+        median = self.median.update(angle)
+        if self.value is None:
+            self.value = median
+        else:
+            previous = self.value
+            self.value = self.alpha * median + (1 - self.alpha) * self.value
+            self.velocity = (self.value - previous) / _step_seconds(self._last_time, timestamp, self.frame_rate)
+        self._last_time = timestamp
+        return self.value
+
+    def reset(self):
+        self.median.reset()
+        self.value = None
+        self.velocity = 0.0
+        self._last_time = None
+
+    @property
+    def latency_frames(self) -> float:
+        return self.median.latency_frames + (1 - self.alpha) / self.alpha
+
+
+class OneEuroSmoother:
+    """
+    One-Euro filter (Casiez et al.): an EMA whose cutoff rises with speed, so still poses are
+    smoothed hard while fast movement passes through with little lag. Time advances by the
+    timestamp delta, or one frame at `frame_rate` when updates carry no timestamps.
+    """
+
+    def __init__(self, frame_rate: float = SMOOTHING_FRAME_RATE, min_cutoff: float = ONE_EURO_MIN_CUTOFF,
+                 beta: float = ONE_EURO_BETA, d_cutoff: float = ONE_EURO_D_CUTOFF):
+        self.frame_rate = frame_rate
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def _alpha(self, cutoff: float, dt: Optional[float] = None) -> float:
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / (dt or 1.0 / self.frame_rate))
+
+    def update(self, angle: float, timestamp: Optional[float] = None) -> float:
+        if self.value is None:
+            self.value = angle
+            self._last_time = timestamp
+            return self.value
+
+        dt = _step_seconds(self._last_time, timestamp, self.frame_rate)
+        self._last_time = timestamp
+        d_alpha = self._alpha(self.d_cutoff, dt)
+        derivative = (angle - self.value) / dt
+        self.derivative = d_alpha * derivative + (1 - d_alpha) * self.derivative
+        alpha = self._alpha(self.min_cutoff + self.beta * abs(self.derivative), dt)
+        previous = self.value
+        self.value = alpha * angle + (1 - alpha) * self.value
+        # Slope of the output: the derivative above is taken against the lagging estimate,
+        # so it overshoots by an amount that depends on the frame rate
+        self.velocity = (self.value - previous) / dt
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.derivative = 0.0
+        self.velocity = 0.0
+        self._last_time = None
+
+    @property
+    def latency_frames(self) -> float:
+        """Upper bound: lag of the underlying EMA at the minimum cutoff (fast motion lags less)"""
+        alpha = self._alpha(self.min_cutoff)
+        return (1 - alpha) / alpha
+
+
+class KalmanSmoother:
+    """
+    Constant-velocity Kalman filter over (angle, angular velocity) in frame units.
+    Tracks ramps without steady-state lag; the noise ratio controls how much jitter is removed.
+    `velocity` converts the per-frame rate with the last frame interval.
+    """
+
+    def __init__(self, process_noise: float = KALMAN_PROCESS_NOISE,
+                 measurement_noise: float = KALMAN_MEASUREMENT_NOISE,
+                 frame_rate: float = SMOOTHING_FRAME_RATE):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.frame_rate = frame_rate
+        self.reset()
+
+    def update(self, angle: float, timestamp: Optional[float] = None) -> float:
+        self._frame_seconds = _step_seconds(self._last_time, timestamp, self.frame_rate)
+        self._last_time = timestamp
+        if self.value is None:
+            self.value, self.rate = angle, 0.0
+            self.p00, self.p01, self.p11 = self.r, 0.0, self.r
+            return self.value
+
+        # Predict one frame ahead (x += v), white-acceleration process noise
+        q = self.q
+        value = self.value + self.rate
+        p00 = self.p00 + 2 * self.p01 + self.p11 + q / 4
+        p01 = self.p01 + self.p11 + q / 2
+        p11 = self.p11 + q
+
+        # Correct with the measured angle
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        residual = angle - value
+        self.value = value + k0 * residual
+        self.rate += k1 * residual
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.rate = 0.0       # degrees per frame
+        self.p00 = self.p01 = self.p11 = 0.0
+        self._last_time = None
+        self._frame_seconds = 1.0 / self.frame_rate
+
+    @property
+    def velocity(self) -> float:
+        return self.rate / self._frame_seconds
+
+    @property
+    def latency_frames(self) -> float:
+        """The velocity state removes ramp lag once converged"""
+        return 0.0
+
+
+SMOOTHERS: Dict[str, Type] = {
+    "median_ema": MedianEmaSmoother,
+    "one_euro": OneEuroSmoother,
+    "kalman": KalmanSmoother,
+}
+
+
+def create_smoother(mode: str, window: int = SMOOTHING_WINDOW):
+    """Builds a per-side smoother; `window` only applies to the median filter"""
+    if mode not in SMOOTHERS:
+        raise ValueError(f"Unknown smoothing filter '{mode}' (expected one of {', '.join(SMOOTHERS)})")
+    if mode == "median_ema":
+        return MedianEmaSmoother(window)
+    return SMOOTHERS[mode]()
@@ -0,0 +1,200 @@
+"""
+Room-scoped, rate-limited, delta-encoded Socket.IO state updates
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+from constants import STATE_EMIT_HZ, STATE_FLOAT_PRECISION
+from wire_format import available_formats, describe, encode_state
+
+# Fields that never change during a session; sent once in "workout_init" instead of every update
+STATIC_GHOST_FIELDS = ('connections',)
+
+
+def _round_floats(value, precision: int = STATE_FLOAT_PRECISION):
+    """Rounds floats recursively so sub-precision jitter does not defeat the delta encoder"""
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {k: _round_floats(v, precision) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round_floats(v, precision) for v in value]
+    return value
+
+
+def diff_state(old, new):
+    """
+    Deep-merge patch turning `old` into `new`: unchanged keys are omitted,
+    nested dicts are diffed recursively and removed keys are sent as None.
+    Returns None when nothing changed.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None if old == new else new
+
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        sub = diff_state(old[key], value)
+        if sub is not None or (value is None and old[key] is not None):
+            patch[key] = sub
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch or None
+
+
+class StateDeltaEncoder:
+    """Keeps the last state sent to a delta room and produces patches against it"""
+
+    def __init__(self):
+        self.seq = 0
+        self.last: Optional[dict] = None
+
+    def encode(self, state: dict) -> Optional[dict]:
+        """Returns {"seq", "base", "patch"} or None when the state did not change"""
+        patch = state if self.last is None else diff_state(self.last, state)
+        if patch is None:
+            return None
+        base = self.seq
+        self.seq += 1
+        self.last = state
+        return {"seq": self.seq, "base": base, "patch": patch}
+
+    def snapshot(self) -> dict:
+        """Baseline for a client joining mid-stream: subsequent patches apply on top of it"""
+        return {"seq": self.seq, "state": self.last or {}}
+
+
+class ListenerRegistry:
+    """Tracks which Socket.IO clients listen to which session, and in which format"""
+
+    def __init__(self):
+        self._by_sid: Dict[str, Tuple[str, str]] = {}
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def join(self, sid: str, session_id: str, fmt: str) -> Optional[Tuple[str, str]]:
+        """Registers a listener, returning the (session_id, format) it previously listened to"""
+        with self._lock:
+            previous = self._by_sid.pop(sid, None)
+            if previous is not None:
+                self._counts[previous] -= 1
+            self._by_sid[sid] = (session_id, fmt)
+            self._counts[(session_id, fmt)] += 1
+            return previous
+
+    def leave(self, sid: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            previous = self._by_sid.pop(sid, None)
+            if previous is not None:
+                self._counts[previous] -= 1
+                if self._counts[previous] <= 0:
+                    del self._counts[previous]
+            return previous
+
+    def membership(self, sid: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            return self._by_sid.get(sid)
+
+    def count(self, session_id: str, fmt: Optional[str] = None) -> int:
+        with self._lock:
+            if fmt is not None:
+                return self._counts.get((session_id, fmt), 0)
+            return sum(n for (sid, _), n in self._counts.items() if sid == session_id)
+
+
+def supported_formats() -> Tuple[str, ...]:
+    """JSON formats plus whichever binary encodings are available on this server"""
+    return ("full", "delta") + tuple(available_formats())
+
+
+def room_name(session_id: str, fmt: str = "full") -> str:
+    return f"session:{session_id}:{fmt}"
+
+
+class StateStream:
+    """
+    Publishes one session's state to its Socket.IO rooms at a fixed maximum rate.
+    "full" listeners get the legacy `workout_update` payload; "delta" listeners get
+    `workout_delta` patches; binary listeners ("packed", "msgpack") get `workout_packed` bytes.
+    Every non-"full" listener receives static data once via `workout_init`.
+    """
+
+    def __init__(self, session_id: str, session, emit: Callable, registry: ListenerRegistry,
+                 max_hz: float = STATE_EMIT_HZ):
+        self.session_id = session_id
+        self.session = session
+        self._emit = emit
+        self.registry = registry
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.encoder = StateDeltaEncoder()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True if someone is listening and the emit interval has elapsed"""
+        if self.registry.count(self.session_id) == 0:
+            return False
+        now = time.time() if now is None else now
+        return now - self._last_emit >= self.min_interval
+
+    def build_state(self) -> dict:
+        """Builds the payload, leaving out static fields when only delta listeners exist"""
+        include_static = self.registry.count(self.session_id, "full") > 0
+        return self.session.get_state_dict(include_static=include_static)
+
+    def publish(self, state: dict, now: Optional[float] = None, force: bool = False) -> bool:
+        """Sends `state` to the session rooms unless rate-limited; returns True if sent"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return False
+            self._last_emit = now
+
+            if self.registry.count(self.session_id, "full"):
+                self._emit("workout_update", state, room_name(self.session_id, "full"))
+
+            if self.registry.count(self.session_id, "delta"):
+                if self.encoder.last is None:
+                    # First delta of this stream: (re)send static data so clients reset their baseline
+                    self._emit("workout_init", self._init_payload(), room_name(self.session_id, "delta"))
+                payload = self.encoder.encode(self._strip_static(state))
+                if payload is not None:
+                    self._emit("workout_delta", payload, room_name(self.session_id, "delta"))
+
+            for fmt in available_formats():
+                if self.registry.count(self.session_id, fmt):
+                    self._emit("workout_packed", encode_state(state, fmt), room_name(self.session_id, fmt))
+        return True
+
+    def init_payload(self, fmt: str = "delta") -> dict:
+        """Static data for a newly joined client: delta baseline or binary schema descriptor"""
+        with self._lock:
+            return self._init_payload(fmt)
+
+    def _init_payload(self, fmt: str = "delta") -> dict:
+        payload = {
+            "session_id": self.session_id,
+            "format": fmt,
+            "exercise_name": self.session.exercise_config.name,
+            "tracked_joint_name": self.session.exercise_config.joint_to_track.value.title(),
+            "connections": self.session.ghost_connections,
+        }
+        if fmt == "delta":
+            payload["baseline"] = self.encoder.snapshot()
+        else:
+            payload["schema"] = describe(fmt)
+        return payload
+
+    @staticmethod
+    def _strip_static(state: dict) -> dict:
+        state = _round_floats(state)
+        ghost = state.get('ghost_pose')
+        if ghost:
+            for key in STATIC_GHOST_FIELDS:
+                ghost.pop(key, None)
+        return state
@@ -0,0 +1,196 @@
+"""
+Compact binary encodings of the live workout state (`workout_packed` Socket.IO event)
+
+Formats:
+    "packed"  - fixed little-endian struct layout, versioned (always available)
+    "msgpack" - MessagePack map with landmarks as a flat quantized int array (needs `msgpack`)
+
+Packed layout, version 1 (all little-endian):
+    header   : magic b"PW", version u8, flags u8, phase u8, remaining u8, progress u8, ghost_color u8
+    per side : RIGHT then LEFT -> rep_count u16, stage u8, angle i16, accuracy u8,
+               feedback_color u8, rep_time f32, min_rep_time f32, curr_rep_time f32
+    strings  : RIGHT feedback, LEFT feedback, calibration message, ghost instruction
+               (each u16 byte length + UTF-8)
+    landmarks: count u8, then count * (x u16, y u16) quantized over [LANDMARK_MIN, LANDMARK_MAX]
+flags: bit0 gesture V_SIGN, bit1 calibration active
+"""
+import struct
+from typing import List, Optional
+
+import numpy as np
+
+from constants import ArmStage, WorkoutPhase, WIRE_LANDMARK_MIN, WIRE_LANDMARK_MAX
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+WIRE_VERSION = 1
+MAGIC = b"PW"
+
+PHASES: List[str] = [p.value for p in WorkoutPhase]
+STAGES: List[str] = [s.value for s in ArmStage]
+COLORS: List[str] = ["GRAY", "GREEN", "YELLOW", "RED", "WHITE"]
+
+FLAG_GESTURE = 0x01
+FLAG_CALIBRATING = 0x02
+
+_HEADER = struct.Struct("<2sBBBBBB")
+_SIDE = struct.Struct("<HBhBBfff")
+_STR_LEN = struct.Struct("<H")
+_QUANT_SCALE = 65535.0 / (WIRE_LANDMARK_MAX - WIRE_LANDMARK_MIN)
+
+
+def available_formats() -> List[str]:
+    """Binary formats this server can produce"""
+    return ["packed", "msgpack"] if msgpack is not None else ["packed"]
+
+
+def describe(fmt: str) -> dict:
+    """Schema descriptor sent to clients in `workout_init`"""
+    return {
+        "format": fmt,
+        "version": WIRE_VERSION,
+        "phases": PHASES,
+        "stages": STAGES,
+        "colors": COLORS,
+        "landmark_range": [WIRE_LANDMARK_MIN, WIRE_LANDMARK_MAX],
+    }
+
+
+def _index(table: List[str], value, default: int = 0) -> int:
+    try:
+        return table.index(value)
+    except ValueError:
+        return default
+
+
+def quantize_landmarks(landmarks: dict) -> np.ndarray:
+    """Ghost landmarks {"0": [x, y], ...} -> flat uint16 array [x0, y0, x1, y1, ...] in index order"""
+    if not landmarks:
+        return np.empty(0, dtype="<u2")
+    coords = np.array([landmarks[k] for k in sorted(landmarks, key=int)], dtype=np.float32)
+    coords = np.clip(coords, WIRE_LANDMARK_MIN, WIRE_LANDMARK_MAX)
+    return np.rint((coords - WIRE_LANDMARK_MIN) * _QUANT_SCALE).astype("<u2").ravel()
+
+
+def dequantize_landmarks(flat) -> np.ndarray:
+    """Inverse of quantize_landmarks; returns an (N, 2) float32 array"""
+    flat = np.asarray(flat, dtype=np.float32).reshape(-1, 2)
+    return flat / _QUANT_SCALE + WIRE_LANDMARK_MIN
+
+
+def _pack_str(text: Optional[str]) -> bytes:
+    data = (text or "").encode("utf-8")[:65535]
+    return _STR_LEN.pack(len(data)) + data
+
+
+def encode_packed(state: dict) -> bytes:
+    """Encodes a get_state_dict() payload into the versioned packed layout"""
+    calibration = state.get('calibration', {})
+    ghost = state.get('ghost_pose', {})
+
+    flags = 0
+    if state.get('gesture') == 'V_SIGN':
+        flags |= FLAG_GESTURE
+    if calibration.get('active'):
+        flags |= FLAG_CALIBRATING
+
+    parts = [_HEADER.pack(
+        MAGIC, WIRE_VERSION, flags,
+        _index(PHASES, state.get('status')),
+        max(0, min(255, int(state.get('remaining', 0)))),
+        max(0, min(255, int(calibration.get('progress', 0)))),
+        _index(COLORS, ghost.get('color')),
+    )]
+
+    for side in ('RIGHT', 'LEFT'):
+        m = state[side]
+        parts.append(_SIDE.pack(
+            min(65535, m['rep_count']),
+            _index(STAGES, m['stage']),
+            max(-32768, min(32767, int(m['angle']))),
+            max(0, min(255, int(m['accuracy']))),
+            _index(COLORS, m['feedback_color']),
+            m['rep_time'], m['min_rep_time'], m['curr_rep_time'],
+        ))
+
+    parts.append(_pack_str(state['RIGHT'].get('feedback')))
+    parts.append(_pack_str(state['LEFT'].get('feedback')))
+    parts.append(_pack_str(calibration.get('message')))
+    parts.append(_pack_str(ghost.get('instruction')))
+
+    quantized = quantize_landmarks(ghost.get('landmarks'))
+    parts.append(struct.pack("<B", len(quantized) // 2))
+    parts.append(quantized.tobytes())
+    return b"".join(parts)
+
+
+def decode_packed(data: bytes) -> dict:
+    """Decodes a packed payload back into a state-like dict (for Python clients and tests)"""
+    view = memoryview(data)
+    magic, version, flags, phase, remaining, progress, ghost_color = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a packed workout state payload")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported packed version {version}")
+    offset = _HEADER.size
+
+    sides = {}
+    for side in ('RIGHT', 'LEFT'):
+        reps, stage, angle, accuracy, color, rep_time, min_rep_time, curr_rep_time = _SIDE.unpack_from(view, offset)
+        offset += _SIDE.size
+        sides[side] = {
+            'rep_count': reps, 'stage': STAGES[stage], 'angle': angle, 'accuracy': accuracy,
+            'feedback_color': COLORS[color], 'rep_time': round(rep_time, 2),
+            'min_rep_time': round(min_rep_time, 2), 'curr_rep_time': round(curr_rep_time, 2),
+        }
+
+    strings = []
+    for _ in range(4):
+        (length,) = _STR_LEN.unpack_from(view, offset)
+        offset += _STR_LEN.size
+        strings.append(bytes(view[offset:offset + length]).decode("utf-8"))
+        offset += length
+    sides['RIGHT']['feedback'], sides['LEFT']['feedback'] = strings[0], strings[1]
+
+    (count,) = struct.unpack_from("<B", view, offset)
+    offset += 1
+    flat = np.frombuffer(view[offset:offset + count * 4], dtype="<u2")
+    landmarks = {str(i): [float(x), float(y)] for i, (x, y) in enumerate(dequantize_landmarks(flat))}
+
+    return {
+        'RIGHT': sides['RIGHT'],
+        'LEFT': sides['LEFT'],
+        'status': PHASES[phase],
+        'remaining': remaining,
+        'gesture': 'V_SIGN' if flags & FLAG_GESTURE else None,
+        'calibration': {'active': bool(flags & FLAG_CALIBRATING), 'message': strings[2], 'progress': progress},
+        'ghost_pose': {'landmarks': landmarks, 'color': COLORS[ghost_color], 'instruction': strings[3]},
+    }
+
+
+def encode_msgpack(state: dict) -> bytes:
+    """MessagePack variant: same fields as JSON, landmarks as a flat quantized int list"""
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    ghost = state.get('ghost_pose', {})
+    payload = {k: v for k, v in state.items() if k not in ('ghost_pose', 'exercise_name', 'tracked_joint_name')}
+    payload['v'] = WIRE_VERSION
+    payload['ghost_pose'] = {
+        'color': ghost.get('color'),
+        'instruction': ghost.get('instruction'),
+        'landmarks': quantize_landmarks(ghost.get('landmarks')).tolist(),
+    }
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+ENCODERS = {
+    "packed": encode_packed,
+    "msgpack": encode_msgpack,
+}
+
+
+def encode_state(state: dict, fmt: str) -> bytes:
+    return ENCODERS[fmt](state)
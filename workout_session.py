@@ -2,36 +2,44 @@
 """
 Main workout session manager - OPTIMIZED FOR USER-CENTERED DESIGN & ACCURACY
 """
-import cv2
-import mediapipe as mp
+import threading
 import numpy as np
-import time
 from typing import Tuple, Optional, Dict
 from collections import deque
 
-from mediapipe.python.solutions.holistic import PoseLandmark as mp_pose_lm 
-from models import ArmMetrics, CalibrationData, SessionHistory, GhostPose, Landmark2D 
+# cv2 / mediapipe are imported where frames are handled: client-landmark, replay and
+# headless scoring paths (and server startup) never pay for loading them
+from constants import PoseLandmark as mp_pose_lm
+from models import ArmMetrics, CalibrationData, SessionHistory, GhostPose 
 from ai_engine import AIEngine
-
-# Initialize MediaPipe Drawing Utils
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
-mp_holistic = mp.solutions.holistic
+from model_pool import create_model, close_when_idle
+from clock import SYSTEM_CLOCK
+from profiling import create_profiler, perf
 
 class WorkoutSession:
     """Manages entire workout session state with optimized performance and clean visuals"""
     
-    def __init__(self, exercise_name: str = "Bicep Curl"):
+    def __init__(self, exercise_name: str = "Bicep Curl", model_pool=None, inference_mode: str = None,
+                 adaptive_inference: Optional[bool] = None, headless: bool = False,
+                 smoothing_filter: Optional[str] = None, predictive: Optional[bool] = None,
+                 clock=None, profiling: Optional[bool] = None, form_service=None):
         from constants import (WorkoutPhase, WORKOUT_COUNTDOWN_TIME,
                                CALIBRATION_HOLD_TIME, SMOOTHING_WINDOW, 
                                SAFETY_MARGIN, MIN_REP_DURATION, 
-                               EXERCISE_PRESETS) 
+                               EXERCISE_PRESETS, INFERENCE_MODE,
+                               ADAPTIVE_INFERENCE, REP_PREDICTIVE, REP_PREDICTIVE_FILTER) 
+        from adaptive_scheduler import AdaptiveInferenceScheduler
         
         from angle_calculator import AngleCalculator
         from pose_processor import PoseProcessor
         from calibration import CalibrationManager
         from rep_counter import RepCounter
         
+        # Session time source: wall clock live, a SimulatedClock for replays and offline scoring
+        self.clock = clock or SYSTEM_CLOCK
+        # Per-stage latency histograms (a no-op profiler when profiling is off)
+        self.profiler = create_profiler(profiling)
+
         # Load the configuration for the selected exercise
         self.exercise_config = EXERCISE_PRESETS.get(exercise_name, EXERCISE_PRESETS["Bicep Curl"])
         
@@ -41,6 +49,7 @@ class WorkoutSession:
         self.countdown_time = WORKOUT_COUNTDOWN_TIME
         
         # --- UI & VISUAL STATE ---
+        self.headless = headless # Metrics only: no overlay, no BGR round-trip, no frames returned
         self.show_ghost = False # DEFAULT: Show CV Dots first
         self.ghost_visible = True
         
@@ -53,7 +62,11 @@ class WorkoutSession:
         self.color_buffer = deque(maxlen=2)
         
         # Initialize internal components
-        angle_calc = AngleCalculator(SMOOTHING_WINDOW)
+        # Predictive rep counting needs a filter with a usable velocity estimate
+        self.predictive = REP_PREDICTIVE if predictive is None else predictive
+        if smoothing_filter is None and self.predictive:
+            smoothing_filter = REP_PREDICTIVE_FILTER
+        angle_calc = AngleCalculator(SMOOTHING_WINDOW, filter_mode=smoothing_filter)
         self.pose_processor = PoseProcessor(angle_calc, self.exercise_config)
         
         self.calibration_data = CalibrationData()
@@ -61,23 +74,41 @@ class WorkoutSession:
             self.pose_processor,
             self.calibration_data, 
             CALIBRATION_HOLD_TIME, 
-            SAFETY_MARGIN
+            SAFETY_MARGIN,
+            clock=self.clock
         )
         
         # RepCounter handles new accuracy and stabilization logic
-        self.rep_counter = RepCounter(self.calibration_data, MIN_REP_DURATION)
+        self.rep_counter = RepCounter(self.calibration_data, MIN_REP_DURATION, predictive=self.predictive,
+                                      clock=self.clock)
         self.history = SessionHistory()
         
         # MediaPipe Settings
         self.holistic_model = None
-        self.cap = None
+        self._owns_model = True
+        self.model_pool = model_pool
+        self.inference_mode = inference_mode or INFERENCE_MODE
+
+        # Adaptive inference rate (None = run the model on every frame)
+        if adaptive_inference is None:
+            adaptive_inference = ADAPTIVE_INFERENCE
+        self.scheduler = AdaptiveInferenceScheduler(
+            self.exercise_config.right_landmarks, self.exercise_config.left_landmarks
+        ) if adaptive_inference else None
+        self._leased_model = False
+        self.source = None
+        self.recorder = None    # LandmarkRecorder while a recording is running
         self.min_detection_conf = 0.5 
         self.min_tracking_conf = 0.5 
 
         # AI & Feedback State
         self.last_ai_check = 0
+        self._ai_feature_indices = list(self.exercise_config.ai_features_landmarks)
         self.ai_interval = 0.2  
         self.ai_latched_state = {'RIGHT': False, 'LEFT': False}
+        # Shared FormInferenceService (None = predict synchronously in the frame loop)
+        self.form_service = form_service
+        self._ai_generation = 0   # bumped on start so late predictions from a previous run are ignored
         self.listening_mode = False 
         self.last_feedback_text = {'RIGHT': "", 'LEFT': ""}
 
@@ -102,15 +133,31 @@ class WorkoutSession:
         
         # Gesture Stabilization
         self._frames_in_active = 0 
+        self.gesture_detected = False
         self.gesture_active_until = 0.0 
         self.gesture_hold_duration = 2.0 
+
+        # Client-side landmark ingestion (no camera / no server inference)
+        self.use_camera = True
+        self.client_time_offset = None
+        self.last_ingest_time = 0.0
     
-    def start(self):
-        """Initializes the session components and starts the camera"""
+    def start(self, use_camera: bool = True, source=None, holistic_model=None,
+              record_path: Optional[str] = None):
+        """
+        Initializes the session components and opens the frame source.
+        With use_camera=False the session only consumes landmarks pushed by the client.
+        `source` is any FrameSource (defaults to the live camera); `holistic_model` may be
+        supplied by the caller, in which case the caller keeps ownership of the model.
+        Otherwise a warm model is leased from `model_pool` when one was given.
+        `record_path` captures every frame's landmarks to a replayable recording.
+        """
+        from frame_sources import CameraSource
         from constants import WorkoutPhase
         
+        now = self.clock.now()
         for arm in ['RIGHT', 'LEFT']:
-            self.arm_metrics[arm] = ArmMetrics()
+            self.arm_metrics[arm] = ArmMetrics(last_down_time=now, stage_start_time=now)
         
         self.history.reset()
         self.pose_processor.angle_calculator.reset_buffers()
@@ -118,65 +165,185 @@ class WorkoutSession:
         self.color_buffer.clear()
         
         self.ai_latched_state = {'RIGHT': False, 'LEFT': False}
+        self._ai_generation += 1
+        if self.form_service is not None:
+            self.form_service.cancel(self)
         self.last_feedback_text = {'RIGHT': "", 'LEFT': ""}
         self.ghost_pose = GhostPose(instruction="Ready...", connections=self.ghost_connections) 
         self._frames_in_active = 0 
         self.gesture_active_until = 0.0
+        self.use_camera = use_camera
+        self.client_time_offset = None
+        self.last_ingest_time = 0.0
+        if self.scheduler is not None:
+            self.scheduler.reset()
+        self._close_recorder()
+
+        if not use_camera:
+            self.calibration_manager.start()
+            self.phase = WorkoutPhase.CALIBRATION
+            self._open_recorder(record_path)
+            return
 
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+        self.source = source if source is not None else CameraSource()
+        if not self.source.is_opened() and not self.source.open():
+            self.source = None
+            raise RuntimeError("Frame source not accessible")
         
-        self.holistic_model = mp.solutions.holistic.Holistic(
-            min_detection_confidence=self.min_detection_conf,
-            min_tracking_confidence=self.min_tracking_conf,
-            model_complexity=0,
-            smooth_landmarks=True
-        )
+        self._owns_model = False
+        self._leased_model = False
+        if holistic_model is not None:
+            self.holistic_model = holistic_model
+        elif self.model_pool is not None:
+            try:
+                self.holistic_model = self.model_pool.acquire()
+            except Exception:
+                self.source.release()
+                self.source = None
+                raise
+            self._leased_model = True
+        else:
+            self.holistic_model = create_model(self.inference_mode, self.min_detection_conf, self.min_tracking_conf)
+            self._owns_model = True
         
         self.calibration_manager.start()
         self.phase = WorkoutPhase.CALIBRATION
+        self._open_recorder(record_path)
     
-    def stop(self):
-        """Release camera and model resources"""
+    def _open_recorder(self, record_path: Optional[str]):
+        if record_path:
+            from landmark_recording import LandmarkRecorder
+            self.recorder = LandmarkRecorder(record_path, self.exercise_config.name,
+                                             origin=self.calibration_manager.start_time)
+            print(f"🎙️ Recording landmarks to {record_path}")
+
+    def _close_recorder(self, in_use_by: Optional[threading.Thread] = None):
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        if in_use_by is not None and in_use_by.is_alive():
+            # A straggling inference thread may still be recording its last frame
+            def _close():
+                in_use_by.join()
+                recorder.close()
+            threading.Thread(target=_close, name="recorder-close", daemon=True).start()
+        else:
+            recorder.close()
+
+    def stop(self, model_in_use_by: Optional[threading.Thread] = None):
+        """
+        Release camera and model resources.
+        `model_in_use_by` is a thread that may still be running inference (a pipeline stage that
+        did not exit in time); the model is then never returned to the pool, only closed once
+        that thread is done.
+        """
         from constants import WorkoutPhase
-        if self.cap is not None: self.cap.release()
-        if self.holistic_model is not None: self.holistic_model.close()
+        self._close_recorder(model_in_use_by)
+        if self.form_service is not None:
+            self.form_service.cancel(self)
+        if self.source is not None: self.source.release()
+        if self.holistic_model is not None:
+            if self._leased_model:
+                if model_in_use_by is not None and model_in_use_by.is_alive():
+                    self.model_pool.discard(self.holistic_model, model_in_use_by)
+                else:
+                    self.model_pool.release(self.holistic_model)
+            elif self._owns_model: close_when_idle(self.holistic_model, model_in_use_by)
         self.holistic_model = None
+        self._leased_model = False
         self.phase = WorkoutPhase.INACTIVE
 
+    def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Grabs the next raw frame from the frame source (capture stage)"""
+        if self.source is None or not self.source.is_opened():
+            return False, None
+        return self.source.read()
+
     def process_frame(self) -> Tuple[Optional[np.ndarray], bool]:
         """Main processing loop optimized for clean visuals"""
-        from constants import WorkoutPhase
-        
-        if self.cap is None or not self.cap.isOpened(): 
-            return None, False
-        
-        success, image = self.cap.read()
+        success, image = self.read_frame()
         if not success: return None, False
-        
+        return self.process_image(image)
+
+    def process_image(self, image: np.ndarray, current_time: Optional[float] = None) -> Tuple[Optional[np.ndarray], bool]:
+        """
+        Runs inference, phase logic and overlay on an already captured frame.
+        `current_time` defaults to the session clock; offline callers may pass the video position.
+        Headless sessions return (None, True): the frame was processed but nothing is rendered.
+        """
+        if self.holistic_model is None:
+            return None, False
+        if current_time is None:
+            current_time = self.clock.now()
+        import cv2
+
+        profiler = self.profiler
+        t = perf()
         image = cv2.flip(image, 1) # Mirror view for comfort
+        t = profiler.since("flip", t)
 
-        image.flags.writeable = False
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = self.holistic_model.process(image)
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if self.scheduler is not None and not self.scheduler.should_infer(self.phase, current_time):
+            # Patient is still: reuse extrapolated landmarks instead of running the model
+            results = self.scheduler.interpolate(current_time)
+        else:
+            inference_start = t
+            image.flags.writeable = False
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            t = profiler.since("color_convert", t)
+            results = self.holistic_model.process(image)
+            t = profiler.since("inference", t)
+            if not self.headless:
+                image.flags.writeable = True
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                t = profiler.since("color_convert", t)
+
+            if self.scheduler is not None:
+                self.scheduler.record_inference(self.pose_processor.landmarks_to_array(results),
+                                                self.phase, current_time, t - inference_start)
         
-        current_time = time.time()
+        self._process_results(results, current_time)
+
+        if self.headless:
+            return None, True
+
+        # --- CLEAN RENDERING ---
+        # Removed "Optimal Flow" and "Transitioning" text overlays as requested
+        t = perf()
+        self._draw_overlay(image, results) 
+        profiler.since("overlay", t)
         
+        return image, True
+
+    def process_landmarks(self, results, current_time: Optional[float] = None) -> bool:
+        """Runs gesture, calibration and rep logic on landmarks computed elsewhere (no image)"""
+        from constants import WorkoutPhase
+        if self.phase == WorkoutPhase.INACTIVE:
+            return False
+        self._process_results(results, self.clock.now() if current_time is None else current_time)
+        return True
+
+    def _process_results(self, results, current_time: float):
+        """Gesture detection and phase logic shared by camera and client-landmark modes"""
+        from constants import WorkoutPhase
+
+        recorder = self.recorder   # stop() may detach it from another thread
+        if recorder is not None:
+            recorder.record(current_time, results, self.pose_processor.landmarks_to_array(results))
+
         # --- GESTURE DETECTION ---
+        t = perf()
         raw_gesture_detected = self.pose_processor.detect_v_sign(results)
         if raw_gesture_detected:
             self.gesture_active_until = current_time + self.gesture_hold_duration
             self.gesture_detected = True
         else:
             self.gesture_detected = (current_time < self.gesture_active_until)
+        t = self.profiler.since("gesture", t)
 
         # --- PHASE LOGIC ---
         if self.phase == WorkoutPhase.CALIBRATION:
             self._process_calibration(results, current_time)
+            self.profiler.since("calibration", t)
         elif self.phase == WorkoutPhase.COUNTDOWN:
             self._process_countdown(current_time)
         elif self.phase == WorkoutPhase.ACTIVE:
@@ -186,29 +353,26 @@ class WorkoutSession:
             else:
                 self._process_workout(results, current_time)
 
-        # --- CLEAN RENDERING ---
-        # Removed "Optimal Flow" and "Transitioning" text overlays as requested
-        self._draw_overlay(image, results) 
-        
-        return image, True
-
     def _draw_overlay(self, image: np.ndarray, results=None):
         """Draws clean overlay without technical black boxes"""
+        import cv2
         h, w, _ = image.shape
 
         if self.show_ghost:
             ghost_color = self.get_cv_color(self.ghost_pose.color)
-            for p1_idx, p2_idx in self.ghost_pose.connections:
-                p1 = self.ghost_pose.landmarks.get(p1_idx)
-                p2 = self.ghost_pose.landmarks.get(p2_idx)
-                if p1 and p2:
-                    p1_px = (int(p1.x * w), int(p1.y * h))
-                    p2_px = (int(p2.x * w), int(p2.y * h))
+            points = self.ghost_pose.points
+            if points is not None:
+                pixels = (points * (w, h)).astype(int).tolist()
+                for p1_idx, p2_idx in self.ghost_pose.connections:
+                    p1_px, p2_px = tuple(pixels[p1_idx]), tuple(pixels[p2_idx])
                     cv2.line(image, p1_px, p2_px, ghost_color, 2)
                     cv2.circle(image, p1_px, 5, ghost_color, -1)
                     cv2.circle(image, p2_px, 5, ghost_color, -1)
         else:
             if results and results.pose_landmarks:
+                import mediapipe as mp
+                mp_drawing, mp_holistic = mp.solutions.drawing_utils, mp.solutions.holistic
+                mp_drawing_styles = mp.solutions.drawing_styles
                 mp_drawing.draw_landmarks(
                     image,
                     results.pose_landmarks,
@@ -224,17 +388,27 @@ class WorkoutSession:
             self.ghost_pose.instruction = "Please step into view"
             return
         
+        points = self.pose_processor.landmarks_to_array(results)
+        if points is None:
+            return
+
+        profiler = self.profiler
         if (current_time - self.last_ai_check) > self.ai_interval:
             self.last_ai_check = current_time
-            self._update_ai_latch(results)
+            t = perf()
+            self._update_ai_latch(points)
+            profiler.since("ai_form", t)
 
-        angles = self.pose_processor.get_both_arm_angles(results)
+        t = perf()
+        angles = self.pose_processor.get_both_arm_angles(results, current_time)
         
         for arm in ['RIGHT', 'LEFT']:
             if angles[arm] is not None:
                 self.arm_metrics[arm].angle = angles[arm]
                 # RepCounter now updates accuracy internally per rep
-                self.rep_counter.process_rep(arm, angles[arm], self.arm_metrics[arm], current_time, self.history)
+                velocity = self.pose_processor.angle_calculator.get_velocity(arm) if self.predictive else None
+                self.rep_counter.process_rep(arm, angles[arm], self.arm_metrics[arm], current_time, self.history,
+                                             velocity)
                 
                 # Dynamic Feedback Color Logic
                 if self.arm_metrics[arm].feedback:
@@ -244,15 +418,14 @@ class WorkoutSession:
                 elif self.arm_metrics[arm].stage in [ArmStage.MOVING_UP.value, ArmStage.MOVING_DOWN.value]:
                     self.arm_metrics[arm].feedback_color = "YELLOW"
 
-        if results.pose_landmarks:
-             self._calculate_ideal_pose_realtime(results.pose_landmarks.landmark)
+        self.history.append(round(current_time - self.start_time, 2), angles['RIGHT'] or 0, angles['LEFT'] or 0)
+        t = profiler.since("rep_counting", t)
 
-        self.history.time.append(round(current_time - self.start_time, 2))
-        self.history.right_angle.append(angles['RIGHT'] or 0)
-        self.history.left_angle.append(angles['LEFT'] or 0)
+        self._calculate_ideal_pose_realtime(points)
+        profiler.since("ghost_ik", t)
 
-    def _calculate_ideal_pose_realtime(self, reference_landmarks) -> None:
-        """Calculates Inverse Kinematics for the ghost skeleton"""
+    def _calculate_ideal_pose_realtime(self, points: np.ndarray) -> None:
+        """Calculates Inverse Kinematics for the ghost skeleton from the frame's (33, 4) landmark array"""
         from constants import ArmStage, ExerciseJoint
         
         if not self.show_ghost: return
@@ -260,10 +433,8 @@ class WorkoutSession:
         metrics = self.arm_metrics['RIGHT']
         target_stage = ArmStage.UP.value if metrics.stage in [ArmStage.DOWN.value, ArmStage.MOVING_UP.value] else ArmStage.DOWN.value
         
-        target_landmarks_2d = {}
-        for idx in range(33):
-            lm = reference_landmarks[idx]
-            target_landmarks_2d[idx] = Landmark2D(x=lm.x, y=lm.y)
+        # The ghost keeps its own copy: the landmark buffer is overwritten next frame
+        target = points[:, :2].astype(np.float64)
 
         R_A, R_B, R_C = self.exercise_config.right_landmarks
         L_A, L_B, L_C = self.exercise_config.left_landmarks
@@ -271,30 +442,19 @@ class WorkoutSession:
         target_angle = (self.calibration_manager.data.contracted_threshold 
                         if target_stage == ArmStage.UP.value 
                         else self.calibration_manager.data.extended_threshold)
+        rotation_angle = np.pi - np.radians(target_angle) if self.exercise_config.joint_to_track in [ExerciseJoint.ELBOW, ExerciseJoint.KNEE] else np.radians(target_angle)
+        facing_camera = target[R_A, 0] > target[L_A, 0]
 
-        # Inverse Kinematics Logic for Right Arm
-        if all(lm in target_landmarks_2d for lm in [R_A, R_B, R_C]):
-            P_A = np.array([target_landmarks_2d[R_A].x, target_landmarks_2d[R_A].y])
-            P_B = np.array([target_landmarks_2d[R_B].x, target_landmarks_2d[R_B].y])
-            orig_len_BC = np.hypot(reference_landmarks[R_C].x - reference_landmarks[R_B].x, reference_landmarks[R_C].y - reference_landmarks[R_B].y)
-            V_BA = P_A - P_B 
+        # Inverse Kinematics: rotate B->C about the vertex B, keeping the observed segment length
+        for (A, B, C), sign in (((R_A, R_B, R_C), 1.0), ((L_A, L_B, L_C), -1.0)):
+            V_BA = target[A] - target[B]
+            V_BC = target[C] - target[B]
+            orig_len_BC = np.hypot(V_BC[0], V_BC[1])
             angle_BA = np.arctan2(V_BA[1], V_BA[0])
-            rotation_angle = np.pi - np.radians(target_angle) if self.exercise_config.joint_to_track in [ExerciseJoint.ELBOW, ExerciseJoint.KNEE] else np.radians(target_angle)
-            final_angle = angle_BA + rotation_angle if target_landmarks_2d[R_A].x > target_landmarks_2d[L_A].x else angle_BA - rotation_angle 
-            target_landmarks_2d[R_C] = Landmark2D(x=P_B[0] + orig_len_BC * np.cos(final_angle), y=P_B[1] + orig_len_BC * np.sin(final_angle))
-
-        # Inverse Kinematics Logic for Left Arm
-        if all(lm in target_landmarks_2d for lm in [L_A, L_B, L_C]):
-            P_A_L = np.array([target_landmarks_2d[L_A].x, target_landmarks_2d[L_A].y])
-            P_B_L = np.array([target_landmarks_2d[L_B].x, target_landmarks_2d[L_B].y])
-            orig_len_BC_L = np.hypot(reference_landmarks[L_C].x - reference_landmarks[L_B].x, reference_landmarks[L_C].y - reference_landmarks[L_B].y)
-            V_BA_L = P_A_L - P_B_L
-            angle_BA_L = np.arctan2(V_BA_L[1], V_BA_L[0])
-            rotation_angle = np.pi - np.radians(target_angle) if self.exercise_config.joint_to_track in [ExerciseJoint.ELBOW, ExerciseJoint.KNEE] else np.radians(target_angle)
-            final_angle_L = angle_BA_L - rotation_angle if target_landmarks_2d[R_A].x > target_landmarks_2d[L_A].x else angle_BA_L + rotation_angle 
-            target_landmarks_2d[L_C] = Landmark2D(x=P_B_L[0] + orig_len_BC_L * np.cos(final_angle_L), y=P_B_L[1] + orig_len_BC_L * np.sin(final_angle_L))
-
-        self.ghost_pose.landmarks = target_landmarks_2d
+            final_angle = angle_BA + sign * rotation_angle if facing_camera else angle_BA - sign * rotation_angle
+            target[C] = target[B] + orig_len_BC * np.array([np.cos(final_angle), np.sin(final_angle)])
+
+        self.ghost_pose.points = target
         self.ghost_pose.color = self._quick_color_smooth(metrics.feedback_color)
         self.ghost_pose.instruction = metrics.feedback.replace("AI: ", "") if metrics.feedback else "Maintain Form"
 
@@ -322,22 +482,33 @@ class WorkoutSession:
             self.ghost_pose.instruction = f"START IN {self.countdown_remaining}"
             self.ghost_pose.color = "YELLOW"
 
-    def _update_ai_latch(self, results):
-        """ML-based form quality prediction"""
-        feature_indices = self.exercise_config.ai_features_landmarks
-        if not results.pose_landmarks: return
+    def _update_ai_latch(self, points: np.ndarray):
+        """ML-based form quality prediction (queued to the shared batch worker when one is set)"""
+        from constants import FORM_FEATURE_COUNT
         try:
-            landmarks = results.pose_landmarks.landmark
-            features = [coord for idx in feature_indices for coord in (landmarks[idx].x, landmarks[idx].y)]
-            if len(features) == 16:
-                prediction = AIEngine.predict_form(features)
-                self.ai_latched_state['RIGHT'] = (prediction == 0)
-                self.ai_latched_state['LEFT'] = (prediction == 0)
+            features = points[self._ai_feature_indices, :2].ravel()
+            if len(features) == FORM_FEATURE_COUNT:
+                generation = self._ai_generation
+                exercise_name = self.exercise_config.name
+                if self.form_service is not None and self.form_service.submit(
+                        self, features, lambda prediction: self._apply_ai_prediction(prediction, generation),
+                        exercise_name):
+                    return
+                self._apply_ai_prediction(AIEngine.predict_form(features, exercise_name), generation)
         except Exception: pass
 
-    def get_state_dict(self) -> dict:
-        """Returns full session state including Rep Accuracy"""
-        return {
+    def _apply_ai_prediction(self, prediction: int, generation: int):
+        """Latches a form prediction (called from the inference worker in batched mode)"""
+        if generation != self._ai_generation:
+            return
+        self.ai_latched_state = {'RIGHT': prediction == 0, 'LEFT': prediction == 0}
+
+    def get_state_dict(self, include_static: bool = True) -> dict:
+        """
+        Returns full session state including Rep Accuracy.
+        include_static=False leaves out data that never changes (ghost skeleton connections).
+        """
+        state = {
             'exercise_name': self.exercise_config.name,
             'tracked_joint_name': self.exercise_config.joint_to_track.value.title(),
             'RIGHT': self.arm_metrics['RIGHT'].to_dict(),  
@@ -351,12 +522,15 @@ class WorkoutSession:
                 'progress': self.calibration_manager.data.progress
             },
             'ghost_pose': {
-                'landmarks': {str(k): [v.x, v.y] for k, v in self.ghost_pose.landmarks.items()},
+                'landmarks': self.ghost_pose.landmarks_dict(),
                 'color': self.ghost_pose.color,
                 'instruction': self.ghost_pose.instruction,
                 'connections': self.ghost_connections
             }
         }
+        if not include_static:
+            del state['ghost_pose']['connections']
+        return state
     
     def get_final_report(self) -> dict:
         """Final summary report for session review"""